@@ -10,23 +10,28 @@ import ast
 import sqlite3
 import json
 import os
+import re
 import sys
 import time
-import tempfile
 import subprocess
-import hashlib
+import secrets
+import functools
 import threading
+import queue
+import atexit
 from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 # ---- Windows compatibility: DO NOT import linux-only modules like resource/pwd/grp ----
 
 try:
+    from rich import box
     from rich.console import Console
     from rich.table import Table
     from rich.panel import Panel
@@ -56,10 +61,10 @@ CONFIG = {
     'REPORTS_DIR': os.getenv('PYMASTER_REPORTS_DIR', 'reports'),
     'MAX_HINTS': int(os.getenv('PYMASTER_MAX_HINTS', '3')),
     'MAX_CONCURRENT_EXECUTIONS': int(os.getenv('PYMASTER_MAX_CONCURRENT', '5')),
+    # Opt-in: JIT-compile numeric user solutions in the sandbox before timing
+    'USE_NUMBA': os.getenv('PYMASTER_USE_NUMBA', 'false').lower() == 'true',
 }
 
-execution_semaphore = threading.Semaphore(CONFIG['MAX_CONCURRENT_EXECUTIONS'])
-
 PYMASTER_ART = r"""
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                                                                              ║
@@ -106,22 +111,156 @@ class ChallengeResult:
     hints_used: int = 0
 
 
+@dataclass
+class CodeBundle:
+    """One-time analysis of a submission, shared by every checker.
+
+    Parsing and line-splitting happen once here instead of once per
+    validator; the parse itself goes through the lru-cached helper so
+    bundles for identical code are nearly free.
+    """
+    code: str
+    tree: Optional[ast.AST]
+    lines: List[str]
+    syntax_error: Optional[str]
+
+    @classmethod
+    def from_source(cls, code: str) -> "CodeBundle":
+        tree, error = _parse_source(code)
+        return cls(code=code, tree=tree, lines=code.splitlines(), syntax_error=error)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Database Manager (SQLite)
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _dump_feedback(feedback: List[str]) -> str:
+    # Compact separators and raw UTF-8 keep the stored blob small; the
+    # emoji-heavy feedback lines would otherwise balloon as \uXXXX escapes
+    return json.dumps(feedback, separators=(',', ':'), ensure_ascii=False)
+
+
+# Fixed query variants so SQLite's prepared-statement cache gets exact
+# string matches instead of per-call f-string rebuilds
+_Q_PROGRESS_ALL = '''
+    SELECT user_id, module, concept, attempts, correct_attempts, last_attempt, mastery_level
+    FROM user_progress WHERE user_id = ?
+'''
+_Q_PROGRESS_MOD = _Q_PROGRESS_ALL + ' AND module = ?'
+_Q_PROGRESS_CON = _Q_PROGRESS_ALL + ' AND concept = ?'
+_Q_PROGRESS_MOD_CON = _Q_PROGRESS_MOD + ' AND concept = ?'
+
+_Q_UPSERT_PROGRESS = '''
+    INSERT INTO user_progress
+    (user_id, module, concept, attempts, correct_attempts, last_attempt, mastery_level)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, module, concept) DO UPDATE SET
+        attempts = excluded.attempts,
+        correct_attempts = excluded.correct_attempts,
+        last_attempt = excluded.last_attempt,
+        mastery_level = excluded.mastery_level
+'''
+
+_Q_INSERT_RESULT = '''
+    INSERT INTO challenge_results
+    (challenge_id, user_id, user_code, passed, syntax_valid, performance_score, pep8_score,
+     execution_time, feedback, hints_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_Q_RESULTS_RECENT = 'SELECT * FROM challenge_results WHERE user_id = ? ORDER BY created_at DESC'
+
+_Q_XP_AGGREGATES = '''
+    SELECT COUNT(*), SUM(passed),
+           SUM(pep8_score > 0.8), SUM(performance_score > 0.8),
+           SUM(execution_time < 0.5),
+           SUM(passed AND pep8_score >= 1.0 AND performance_score >= 1.0)
+    FROM challenge_results WHERE user_id = ?
+'''
+
+
 class DatabaseManager:
     def __init__(self, db_path: str = None):
         self.db_path = db_path or CONFIG['DB_PATH']
+        # Single long-lived connection shared by all methods; isolation_level=None
+        # gives autocommit so we control transactions explicitly where needed.
+        # cached_statements=256 keeps every statement we issue (including the
+        # quest-campaign ones) prepared across calls.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                     isolation_level=None, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        # Serialize access: the executor may call us from multiple threads.
+        self._lock = threading.Lock()
+        self._apply_pragmas()
         self.init_database()
+        # Single-consumer background writer: saves enqueue and return
+        # immediately; pending rows are committed in one transaction so the
+        # UI never blocks on fsync latency.
+        self._writer_q: queue.Queue = queue.Queue()
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        # Per-user snapshot cache; any write bumps the epoch and invalidates.
+        self._write_epoch = 0
+        self._snapshot_cache: Dict[str, Tuple[int, tuple]] = {}
         logger.info(f"Database initialized at {self.db_path}")
 
-    def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+    def _apply_pragmas(self):
+        cursor = self._conn.cursor()
+        cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.execute('PRAGMA synchronous = NORMAL')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.execute('PRAGMA cache_size = -20000')
+        cursor.execute('PRAGMA mmap_size = 67108864')
         cursor.execute('PRAGMA foreign_keys = ON')
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The shared process-wide connection. Guard use with .lock."""
+        return self._conn
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self._writer_q.join()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _writer_loop(self):
+        while True:
+            items = [self._writer_q.get()]
+            # Drain whatever else is pending into the same transaction
+            while True:
+                try:
+                    items.append(self._writer_q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    self._conn.execute('BEGIN IMMEDIATE')
+                    try:
+                        for kind, row in items:
+                            if kind == 'challenge_result':
+                                self._conn.execute(_Q_INSERT_RESULT, row)
+                            else:
+                                self._conn.execute(_Q_UPSERT_PROGRESS, row)
+                        self._conn.execute('COMMIT')
+                    except Exception:
+                        self._conn.execute('ROLLBACK')
+                        raise
+            except Exception:
+                logger.exception("Background write failed")
+            finally:
+                for _ in items:
+                    self._writer_q.task_done()
+
+    def init_database(self):
+        cursor = self._conn.cursor()
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS user_progress (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -185,22 +324,16 @@ class DatabaseManager:
             ON achievements(user_id)
         ''')
 
-        conn.commit()
-        conn.close()
-
-    def save_progress(self, progress: UserProgress):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Covering index so get_user_stats aggregations are answered by an
+        # index-only scan instead of per-row table lookups
         cursor.execute('''
-            INSERT INTO user_progress
-            (user_id, module, concept, attempts, correct_attempts, last_attempt, mastery_level)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(user_id, module, concept) DO UPDATE SET
-                attempts = excluded.attempts,
-                correct_attempts = excluded.correct_attempts,
-                last_attempt = excluded.last_attempt,
-                mastery_level = excluded.mastery_level
-        ''', (
+            CREATE INDEX IF NOT EXISTS idx_cr_stats
+            ON challenge_results(user_id, passed, pep8_score, performance_score, execution_time)
+        ''')
+
+    @staticmethod
+    def _progress_row(progress: UserProgress) -> tuple:
+        return (
             progress.user_id,
             progress.module,
             progress.concept,
@@ -208,50 +341,62 @@ class DatabaseManager:
             progress.correct_attempts,
             progress.last_attempt.isoformat() if progress.last_attempt else None,
             progress.mastery_level
-        ))
-        conn.commit()
-        conn.close()
-
-    def get_user_progress(self, user_id: str, module: str = None, concept: str = None) -> List[UserProgress]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        )
 
-        query = "SELECT * FROM user_progress WHERE user_id = ?"
-        params = [user_id]
+    def save_progress(self, progress: UserProgress):
+        """Queue the upsert; the background writer commits it off-thread."""
+        self._write_epoch += 1
+        self._writer_q.put(('progress', self._progress_row(progress)))
 
-        if module:
-            query += " AND module = ?"
-            params.append(module)
-        if concept:
-            query += " AND concept = ?"
-            params.append(concept)
+    def save_progress_bulk(self, progress_list: List[UserProgress]):
+        """Upsert many progress rows in one transaction (one fsync total)."""
+        if not progress_list:
+            return
+        self._write_epoch += 1
+        rows = [self._progress_row(p) for p in progress_list]
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(_Q_UPSERT_PROGRESS, rows)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def get_user_progress(self, user_id: str, module: str = None, concept: str = None,
+                          limit: Optional[int] = None) -> List[UserProgress]:
+        self.flush()  # read-your-writes: drain any queued upserts first
+        if module and concept:
+            query, params = _Q_PROGRESS_MOD_CON, (user_id, module, concept)
+        elif module:
+            query, params = _Q_PROGRESS_MOD, (user_id, module)
+        elif concept:
+            query, params = _Q_PROGRESS_CON, (user_id, concept)
+        else:
+            query, params = _Q_PROGRESS_ALL, (user_id,)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params += (limit,)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
 
         progress_list = []
         for row in rows:
             progress_list.append(UserProgress(
-                user_id=row[1],
-                module=row[2],
-                concept=row[3],
-                attempts=row[4] or 0,
-                correct_attempts=row[5] or 0,
-                last_attempt=datetime.fromisoformat(row[6]) if row[6] else None,
-                mastery_level=row[7] or 0.0
+                user_id=row["user_id"],
+                module=row["module"],
+                concept=row["concept"],
+                attempts=row["attempts"] or 0,
+                correct_attempts=row["correct_attempts"] or 0,
+                last_attempt=datetime.fromisoformat(row["last_attempt"]) if row["last_attempt"] else None,
+                mastery_level=row["mastery_level"] or 0.0
             ))
         return progress_list
 
-    def save_challenge_result(self, result: ChallengeResult, user_id: str):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO challenge_results
-            (challenge_id, user_id, user_code, passed, syntax_valid, performance_score, pep8_score,
-             execution_time, feedback, hints_used)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _result_row(result: ChallengeResult, user_id: str) -> tuple:
+        return (
             result.challenge_id,
             user_id,
             result.user_code,
@@ -260,59 +405,116 @@ class DatabaseManager:
             result.performance_score,
             result.pep8_score,
             result.execution_time,
-            json.dumps(result.feedback),
+            _dump_feedback(result.feedback),
             result.hints_used
-        ))
-        conn.commit()
-        conn.close()
+        )
+
+    def save_challenge_result(self, result: ChallengeResult, user_id: str):
+        """Queue the insert; the background writer commits it off-thread."""
+        self._write_epoch += 1
+        self._writer_q.put(('challenge_result', self._result_row(result, user_id)))
+
+    def save_challenge_results_bulk(self, results: List[ChallengeResult], user_id: str):
+        """Insert many challenge results in one transaction instead of one commit each."""
+        if not results:
+            return
+        self._write_epoch += 1
+        rows = [self._result_row(r, user_id) for r in results]
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(_Q_INSERT_RESULT, rows)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
 
     def start_session(self, user_id: str) -> str:
-        session_id = hashlib.md5(f"{user_id}{datetime.now().isoformat()}".encode()).hexdigest()
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO user_sessions (session_id, user_id) VALUES (?, ?)', (session_id, user_id))
-        conn.commit()
-        conn.close()
+        session_id = secrets.token_hex(16)
+        self._write_epoch += 1
+        with self._lock:
+            self._conn.execute('INSERT INTO user_sessions (session_id, user_id) VALUES (?, ?)', (session_id, user_id))
         return session_id
 
     def end_session(self, session_id: str, challenges_completed: int):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE user_sessions
-            SET end_time = ?, challenges_completed = ?
-            WHERE session_id = ?
-        ''', (datetime.now().isoformat(), challenges_completed, session_id))
-        conn.commit()
-        conn.close()
-
-    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT COUNT(*) FROM challenge_results WHERE user_id = ?', (user_id,))
-        total_challenges = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM challenge_results WHERE user_id = ? AND passed = 1', (user_id,))
-        passed_challenges = cursor.fetchone()[0]
-
-        cursor.execute('''
-            SELECT AVG(pep8_score), AVG(performance_score), AVG(execution_time)
-            FROM challenge_results WHERE user_id = ?
-        ''', (user_id,))
-        avg_row = cursor.fetchone()
+        self._write_epoch += 1
+        with self._lock:
+            self._conn.execute('''
+                UPDATE user_sessions
+                SET end_time = ?, challenges_completed = ?
+                WHERE session_id = ?
+            ''', (datetime.now().isoformat(), challenges_completed, session_id))
+
+    def get_user_snapshot(self, user_id: str) -> Tuple[Dict[str, Any], List[UserProgress],
+                                                       List[Dict[str, Any]], Dict[str, int]]:
+        """Stats, progress, recent results and XP aggregates in one cached fetch.
+
+        Repeated renders (progress view, report, gamification hub) reuse
+        the same snapshot until a write bumps the epoch. Only the 5 rows
+        the hub actually displays are materialized; XP and badge inputs
+        come from the aggregate query instead of the full result list.
+        """
+        cached = self._snapshot_cache.get(user_id)
+        if cached is not None and cached[0] == self._write_epoch:
+            return cached[1]
+        epoch = self._write_epoch
+        stats = self.get_user_stats(user_id)
+        progress = self.get_user_progress(user_id)
+        snapshot = (stats, progress,
+                    self.get_challenge_results(user_id, limit=5),
+                    self.get_xp_aggregates(user_id))
+        self._snapshot_cache[user_id] = (epoch, snapshot)
+        return snapshot
+
+    def get_xp_aggregates(self, user_id: str) -> Dict[str, int]:
+        """Counts that drive XP and badge logic, computed inside SQLite."""
+        self.flush()  # read-your-writes: drain any queued inserts first
+        with self._lock:
+            row = self._conn.execute(_Q_XP_AGGREGATES, (user_id,)).fetchone()
+        return {
+            'attempts': row[0] or 0,
+            'passed': row[1] or 0,
+            'high_pep8': row[2] or 0,
+            'high_performance': row[3] or 0,
+            'fast': row[4] or 0,
+            'perfect': row[5] or 0,
+        }
 
-        cursor.execute('SELECT COUNT(*), SUM(challenges_completed) FROM user_sessions WHERE user_id = ?', (user_id,))
-        session_row = cursor.fetchone()
+    def get_challenge_results(self, user_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recent challenge results (newest first) over the shared connection."""
+        self.flush()  # read-your-writes: drain any queued inserts first
+        query, params = _Q_RESULTS_RECENT, (user_id,)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
 
-        conn.close()
+    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        self.flush()  # read-your-writes: drain any queued inserts first
+        with self._lock:
+            cursor = self._conn.cursor()
+
+            # One aggregate query instead of three round-trips
+            cursor.execute('''
+                SELECT COUNT(*), SUM(passed), AVG(pep8_score), AVG(performance_score), AVG(execution_time)
+                FROM challenge_results WHERE user_id = ?
+            ''', (user_id,))
+            cr_row = cursor.fetchone()
+
+            cursor.execute('SELECT COUNT(*), SUM(challenges_completed) FROM user_sessions WHERE user_id = ?', (user_id,))
+            session_row = cursor.fetchone()
+
+        total_challenges = cr_row[0] or 0
+        passed_challenges = cr_row[1] or 0
         return {
             'total_challenges': total_challenges,
             'passed_challenges': passed_challenges,
             'success_rate': (passed_challenges / total_challenges * 100) if total_challenges else 0,
-            'avg_pep8_score': (avg_row[0] or 0) * 100,
-            'avg_performance_score': (avg_row[1] or 0) * 100,
-            'avg_execution_time': avg_row[2] or 0,
+            'avg_pep8_score': (cr_row[2] or 0) * 100,
+            'avg_performance_score': (cr_row[3] or 0) * 100,
+            'avg_execution_time': cr_row[4] or 0,
             'total_sessions': session_row[0] or 0,
             'total_session_challenges': session_row[1] or 0,
         }
@@ -322,10 +524,192 @@ class DatabaseManager:
 # Safe Code Executor (Windows-compatible)
 # ──────────────────────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=512)
+def _parse_source(code: str) -> Tuple[Optional[ast.AST], Optional[str]]:
+    """Parse once per unique submission; speedrun resubmits hit the cache."""
+    try:
+        return ast.parse(code), None
+    except SyntaxError as e:
+        return None, f"Syntax Error on line {e.lineno}: {e.msg}"
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+
+
+_BLOCKED_IMPORTS = frozenset({
+    "os", "sys", "subprocess", "socket", "shutil", "ctypes",
+    "multiprocessing", "asyncio.subprocess", "urllib", "requests",
+    "glob", "pathlib", "__future__"
+})
+_BLOCKED_CALLS = frozenset({"eval", "exec", "__import__", "open"})
+# Single-pass textual backstop (identifiers are case-sensitive, so no .lower())
+_BLOCKED_RE = re.compile(r'\b(?:eval|exec|__import__|open)\s*\(')
+
+
+@functools.lru_cache(maxsize=512)
+def _safe_code_verdict(code: str) -> bool:
+    tree, _ = _parse_source(code)
+    if tree is None:
+        return True  # let syntax validator handle later
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [a.name.split('.')[0] for a in getattr(node, "names", [])]
+            mod = getattr(node, "module", None)
+            check = names + ([mod.split('.')[0]] if mod else [])
+            if any(x in _BLOCKED_IMPORTS for x in check if x):
+                return False
+        # semantic check: direct calls to blocked builtins
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in _BLOCKED_CALLS):
+            return False
+
+    if _BLOCKED_RE.search(code):
+        return False
+
+    return True
+
+
+# Program run by each pooled worker: reads one JSON request per line from
+# stdin ({"code": ..., "calls": [[expr, args, kwargs], ...]}), executes the
+# code in a fresh namespace, and writes one JSON response line to stdout.
+# User stdout is redirected to a sink so it cannot corrupt the protocol.
+_WORKER_SOURCE = r'''
+import contextlib, io, json, sys
+
+def _run(msg):
+    namespace = {}
+    results = []
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink):
+            exec(compile(msg["code"], "<user_code>", "exec"), namespace)
+            for expr, args, kwargs in msg["calls"]:
+                if not expr:
+                    # No specific function to call; OK if exec succeeded
+                    results.append({"success": True, "result": "OK"})
+                    continue
+                # Resolve the target inside the sandboxed process
+                try:
+                    target = eval(expr, namespace)
+                except Exception as e:
+                    results.append({"success": False, "error": "Cannot resolve target '%s': %s" % (expr, e)})
+                    continue
+                if msg.get("use_numba") and args and all(isinstance(a, (int, float)) for a in args):
+                    # Numeric hot loops benefit most; cache=True keeps the
+                    # compiled artifact across resubmissions. Best effort only.
+                    try:
+                        from numba import njit
+                        target = njit(cache=True)(target)
+                    except Exception:
+                        pass
+                try:
+                    result = target(*args, **kwargs)
+                    # Send JSON-native values as-is so the parent can compare
+                    # without re-parsing; anything that doesn't survive a JSON
+                    # roundtrip (tuples, custom objects, ...) falls back to repr
+                    try:
+                        if json.loads(json.dumps(result)) == result:
+                            payload_result = result
+                        else:
+                            payload_result = {"__repr__": repr(result)}
+                    except (TypeError, ValueError):
+                        payload_result = {"__repr__": repr(result)}
+                    results.append({"success": True, "result": payload_result})
+                except Exception as e:
+                    results.append({"success": False, "error": "Execution error: %s: %s" % (type(e).__name__, e)})
+    except Exception as e:
+        return {"success": False, "error": "Wrapper error: %s: %s" % (type(e).__name__, e)}
+    return {"success": True, "results": results}
+
+for _line in sys.stdin:
+    _line = _line.strip()
+    if not _line:
+        continue
+    try:
+        _msg = json.loads(_line)
+    except Exception as _e:
+        print(json.dumps({"success": False, "error": "Bad request: %s" % _e}), flush=True)
+        continue
+    print(json.dumps(_run(_msg)), flush=True)
+'''
+
+
+# Built once instead of copying the whole environment per spawn; PYTHONPATH
+# is blanked to reduce module search path exposure
+_WORKER_ENV = {**os.environ, "PYTHONPATH": ""}
+
+
+class ExecutorPool:
+    """Pool of long-lived Python worker subprocesses.
+
+    Keeping interpreters warm avoids paying fork+exec plus site/import
+    startup (~30-200 ms) on every submission. Workers are spawned lazily
+    up to `size`; acquire() blocks when all are busy, which also bounds
+    total concurrent child processes.
+    """
+
+    def __init__(self, size: int = None):
+        self._size = size or CONFIG['MAX_CONCURRENT_EXECUTIONS']
+        self._idle: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._spawned = 0
+        self._lock = threading.Lock()
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-I", "-u", "-c", _WORKER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=_WORKER_ENV,
+        )
+
+    def acquire(self) -> subprocess.Popen:
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._spawned < self._size:
+                    self._spawned += 1
+                    return self._spawn()
+            worker = self._idle.get()  # all spawned and busy; wait
+        if worker.poll() is not None:  # worker died while idle
+            return self._spawn()
+        return worker
+
+    def release(self, worker: subprocess.Popen):
+        self._idle.put(worker)
+
+    def discard(self, worker: subprocess.Popen):
+        """Kill a hung/broken worker; a replacement is spawned on next acquire."""
+        try:
+            worker.kill()
+        except Exception:
+            pass
+        with self._lock:
+            self._spawned -= 1
+
+    def shutdown(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.stdin.close()
+                worker.terminate()
+            except Exception:
+                pass
+
+
+_executor_pool = ExecutorPool()
+atexit.register(_executor_pool.shutdown)
+
+
 class SafeCodeExecutor:
     """
     Cross-platform safe executor:
-    - Runs user code in a subprocess with a timeout.
+    - Runs user code in a pooled, long-lived worker subprocess with a timeout.
     - Restricts dangerous imports via a pre-scan.
     - Resolves dotted call targets (e.g., "Solution().process") INSIDE the child.
     """
@@ -335,127 +719,101 @@ class SafeCodeExecutor:
 
     def execute(self, code: str, test_function: Optional[str] = None,
                 args: tuple = (), kwargs: dict = None) -> Tuple[bool, Any, str]:
-        kwargs = kwargs or {}
+        return self.execute_batch(code, [(test_function, tuple(args), kwargs or {})])[0]
+
+    # Below this many calls a single worker is cheaper than fanning out
+    _PARALLEL_THRESHOLD = 4
+
+    def execute_batch(self, code: str,
+                      calls: List[Tuple[Optional[str], tuple, dict]]) -> List[Tuple[bool, Any, str]]:
+        """Run all (function, args, kwargs) calls in warm worker processes.
 
+        Small batches go to one worker; larger ones are split across the
+        pool so slow test cases overlap in wall-clock time.
+        """
         # Simple static safety scan (best effort)
         if not self._is_safe_code(code):
-            return False, None, "Code contains unsafe operations (blocked import or call)."
-
-        with execution_semaphore:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                wrapper = self._make_wrapper(code, test_function, args, kwargs)
-                f.write(wrapper)
-                temp_file = f.name
+            err = "Code contains unsafe operations (blocked import or call)."
+            return [(False, None, err)] * len(calls)
+
+        n_workers = min(CONFIG['MAX_CONCURRENT_EXECUTIONS'], len(calls))
+        if len(calls) < self._PARALLEL_THRESHOLD or n_workers < 2:
+            return self._dispatch(code, calls)
+
+        # Balanced contiguous chunks, one per worker, order preserved
+        chunk_size = -(-len(calls) // n_workers)
+        chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [pool.submit(self._dispatch, code, chunk) for chunk in chunks]
+            outcomes: List[Tuple[bool, Any, str]] = []
+            for future in futures:
+                outcomes.extend(future.result())
+        return outcomes
+
+    def _dispatch(self, code: str,
+                  calls: List[Tuple[Optional[str], tuple, dict]]) -> List[Tuple[bool, Any, str]]:
+        request = json.dumps({
+            "code": code,
+            "calls": [[expr or "", list(args), kwargs] for expr, args, kwargs in calls],
+            "use_numba": CONFIG['USE_NUMBA'],
+        })
+
+        worker = _executor_pool.acquire()
+        try:
+            try:
+                worker.stdin.write(request + "\n")
+                worker.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                _executor_pool.discard(worker)
+                worker = None
+                return [(False, None, f"Execution error: worker unavailable ({e})")] * len(calls)
+
+            line = self._read_response(worker)
+            if line is None:
+                # Hung worker: kill it; the pool respawns on next acquire
+                _executor_pool.discard(worker)
+                worker = None
+                return [(False, None, f"Execution timeout ({self.timeout}s exceeded)")] * len(calls)
+            if not line:
+                _executor_pool.discard(worker)
+                worker = None
+                return [(False, None, "No output")] * len(calls)
 
             try:
-                env = os.environ.copy()
-                # Keep PATH; don't force Unix paths on Windows
-                env["PYTHONPATH"] = ""  # reduce module search path exposure
-
-                result = subprocess.run(
-                    [sys.executable, temp_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    env=env
-                )
-
-                stdout = (result.stdout or "").strip()
-                stderr = (result.stderr or "").strip()
-
-                if stdout:
-                    last_line = stdout.splitlines()[-1].strip()
-                    try:
-                        payload = json.loads(last_line)
-                        if payload.get("success"):
-                            return True, payload.get("result"), ""
-                        else:
-                            return False, None, payload.get("error", "Unknown error")
-                    except json.JSONDecodeError:
-                        # Not our JSON; return stderr or raw stdout
-                        return False, None, stderr or "Invalid output format"
-                else:
-                    return False, None, stderr or "No output"
-
-            except subprocess.TimeoutExpired:
-                return False, None, f"Execution timeout ({self.timeout}s exceeded)"
-            except Exception as e:
-                return False, None, f"Execution error: {e}"
-            finally:
-                try:
-                    os.unlink(temp_file)
-                except Exception:
-                    pass
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                return [(False, None, "Invalid output format")] * len(calls)
+            if payload.get("success"):
+                outcomes = []
+                for item in payload.get("results", []):
+                    if item.get("success"):
+                        outcomes.append((True, item.get("result"), ""))
+                    else:
+                        outcomes.append((False, None, item.get("error", "Unknown error")))
+                # Pad in case the child died mid-batch
+                while len(outcomes) < len(calls):
+                    outcomes.append((False, None, "No result returned"))
+                return outcomes
+            return [(False, None, payload.get("error", "Unknown error"))] * len(calls)
+        finally:
+            if worker is not None:
+                _executor_pool.release(worker)
+
+    def _read_response(self, worker: subprocess.Popen) -> Optional[str]:
+        """Read one response line, enforcing the timeout from the parent side.
+
+        Returns None on timeout, "" if the worker died (EOF).
+        """
+        holder: List[str] = []
+        reader = threading.Thread(target=lambda: holder.append(worker.stdout.readline()), daemon=True)
+        reader.start()
+        reader.join(self.timeout)
+        if reader.is_alive():
+            return None
+        return holder[0].strip() if holder else ""
 
     def _is_safe_code(self, code: str) -> bool:
-        blocked_imports = {
-            "os", "sys", "subprocess", "socket", "shutil", "ctypes",
-            "multiprocessing", "asyncio.subprocess", "urllib", "requests",
-            "glob", "pathlib", "__future__"
-        }
-        blocked_calls = {"eval", "exec", "__import__", "open("}
-
-        try:
-            tree = ast.parse(code)
-        except SyntaxError:
-            return True  # let syntax validator handle later
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                names = [a.name.split('.')[0] for a in getattr(node, "names", [])]
-                mod = getattr(node, "module", None)
-                check = names + ([mod.split('.')[0]] if mod else [])
-                if any(x in blocked_imports for x in check if x):
-                    return False
-
-            # rudimentary string check
-        lower = code.lower()
-        if any(tok in lower for tok in blocked_calls):
-            return False
-
-        return True
-
-    def _make_wrapper(self, code: str, test_function: Optional[str], args: tuple, kwargs: dict) -> str:
-        # Embed test expression safely via JSON to preserve quotes/escapes
-        test_expr_json = json.dumps(test_function if test_function else "")
-        args_json = json.dumps(args)
-        kwargs_json = json.dumps(kwargs)
-
-        return f"""# Auto-generated safe wrapper
-import json
-
-# ===== USER CODE START =====
-{code}
-# ===== USER CODE END =====
-
-def _json_out(payload):
-    try:
-        print(json.dumps(payload))
-    except Exception as _e:
-        print(json.dumps({{"success": False, "error": f"JSON encode error: {{_e}}"}}))
-
-try:
-    test_expr = {test_expr_json}
-    if test_expr:
-        # Resolve the target inside the sandboxed process
-        try:
-            target = eval(test_expr, globals(), locals())
-        except Exception as e:
-            _json_out({{"success": False, "error": f"Cannot resolve target '{{test_expr}}': {{e}}"}})
-        else:
-            try:
-                args = tuple({args_json})
-                kwargs = dict({kwargs_json})
-                result = target(*args, **kwargs)
-                _json_out({{"success": True, "result": repr(result)}})
-            except Exception as e:
-                _json_out({{"success": False, "error": f"Execution error: {{type(e).__name__}}: {{e}}"}})
-    else:
-        # No specific function to call; treat as OK if import/exec succeeded
-        _json_out({{"success": True, "result": "OK"}})
-except Exception as e:
-    _json_out({{"success": False, "error": f"Wrapper error: {{type(e).__name__}}: {{e}}"}})
-"""
+        return _safe_code_verdict(code)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -464,24 +822,28 @@ except Exception as e:
 
 class CodeAnalyzer:
     @staticmethod
-    def validate_syntax(code: str) -> Tuple[bool, List[str]]:
-        try:
-            ast.parse(code)
-            return True, []
-        except SyntaxError as e:
-            return False, [f"Syntax Error on line {e.lineno}: {e.msg}"]
-        except Exception as e:
-            return False, [f"Error: {str(e)}"]
+    def validate_syntax(code) -> Tuple[bool, List[str]]:
+        bundle = code if isinstance(code, CodeBundle) else CodeBundle.from_source(code)
+        if bundle.tree is None:
+            return False, [bundle.syntax_error]
+        return True, []
 
     @staticmethod
-    def check_pep8(code: str) -> Tuple[float, List[str]]:
+    def check_pep8(code) -> Tuple[float, List[str]]:
+        bundle = code if isinstance(code, CodeBundle) else CodeBundle.from_source(code)
         feedback, score = [], 1.0
-        lines = code.splitlines()
-        long_lines = [i + 1 for i, line in enumerate(lines) if len(line) > 79]
+        lines = bundle.lines
+        # Single pass: collect both violations in one iteration over the lines
+        long_lines, trailing = [], []
+        for i, line in enumerate(lines, 1):
+            if len(line) > 79:
+                long_lines.append(i)
+            # Last-char check instead of rstrip(): no per-line string copy
+            if line and (line[-1] == ' ' or line[-1] == '\t'):
+                trailing.append(i)
         if long_lines:
             feedback.append(f"Lines {long_lines[:3]} exceed 79 characters" + (" and more..." if len(long_lines) > 3 else ""))
             score -= min(0.1 * len(long_lines), 0.3)
-        trailing = [i + 1 for i, l in enumerate(lines) if l.rstrip() != l]
         if trailing:
             feedback.append(f"Trailing whitespace on lines {trailing[:3]}")
             score -= 0.05
@@ -494,22 +856,33 @@ class ChallengeValidator:
     def __init__(self):
         self.executor = SafeCodeExecutor()
 
-    def validate_solution(self, user_code: str, test_cases: List[Dict], expected_outputs: List[Any]) -> Tuple[bool, List[str]]:
+    def validate_solution(self, user_code: str, test_cases: List[Dict],
+                          expected_outputs: List[Any]) -> Tuple[bool, List[str], float]:
+        """Returns (all_passed, feedback, execution_time).
+
+        The batch execution is timed here so callers don't need an extra
+        executor roundtrip just to score performance.
+        """
         if not test_cases:
-            return True, ["No test cases defined"]
+            return True, ["No test cases defined"], 0.0
         feedback = []
         passed = 0
-        for i, (tc, exp) in enumerate(zip(test_cases, expected_outputs), start=1):
-            func = tc.get('function')
-            args = tuple(tc.get('args', []))
-            kwargs = dict(tc.get('kwargs', {}))
-            ok, result, err = self.executor.execute(user_code, func, args, kwargs)
+        calls = [(tc.get('function'), tuple(tc.get('args', [])), dict(tc.get('kwargs', {})))
+                 for tc in test_cases]
+        exec_start = time.perf_counter()
+        outcomes = self.executor.execute_batch(user_code, calls)
+        exec_time = time.perf_counter() - exec_start
+        for i, ((ok, result, err), exp) in enumerate(zip(outcomes, expected_outputs), start=1):
             if not ok:
                 feedback.append(f"❌ Test {i}: {err}")
                 continue
-            try:
-                val = ast.literal_eval(result)
-            except Exception:
+            if isinstance(result, dict) and tuple(result) == ("__repr__",):
+                # Non-JSON-native value; fall back to parsing its repr
+                try:
+                    val = ast.literal_eval(result["__repr__"])
+                except Exception:
+                    val = result["__repr__"]
+            else:
                 val = result
             if val == exp:
                 passed += 1
@@ -519,7 +892,7 @@ class ChallengeValidator:
         all_passed = passed == len(test_cases)
         summary = f"🎉 All {len(test_cases)} test cases passed!" if all_passed else f"⚠️  {passed}/{len(test_cases)} test cases passed"
         feedback.insert(0, summary)
-        return all_passed, feedback
+        return all_passed, feedback, exec_time
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -538,6 +911,9 @@ class Challenge(ABC):
         self.hints: List[str] = []
         self.test_cases: List[Dict] = []
         self.expected_outputs: List[Any] = []
+        # Rendered template, filled on first get_template() call; menus and
+        # Panel redraws reuse it instead of re-formatting the f-string.
+        self._template_cache: Optional[str] = None
 
     @abstractmethod
     def get_template(self) -> str:
@@ -556,9 +932,14 @@ class Challenge(ABC):
 
 
 class CorePythonChallenge(Challenge):
+    _SOLUTION = '''def solution(a, b):
+    return a + b
+'''
+
     def get_template(self) -> str:
-        if self.concept == "functions":
-            return f'''# {self.title}
+        if self._template_cache is None:
+            if self.concept == "functions":
+                self._template_cache = f'''# {self.title}
 # {self.description}
 
 def solution(a, b):
@@ -566,39 +947,52 @@ def solution(a, b):
     # return a + b
     pass
 '''
-        return f'''# {self.title}
+            else:
+                self._template_cache = f'''# {self.title}
 # {self.description}
 
 def solution(data):
     """Write your function here"""
     pass
 '''
+        return self._template_cache
 
     def get_solution(self) -> str:
-        return '''def solution(a, b):
-    return a + b
-'''
+        return self._SOLUTION
 
 
 class DataStructuresChallenge(Challenge):
+    _SOLUTION = '''def solution(data):
+    return [x * 2 for x in data if x % 2 == 0]
+'''
+
     def get_template(self) -> str:
-        return f'''# {self.title}
+        if self._template_cache is None:
+            self._template_cache = f'''# {self.title}
 # {self.description}
 
 def solution(data):
     """Return [x*2 for x in data if x % 2 == 0]"""
     pass
 '''
+        return self._template_cache
 
     def get_solution(self) -> str:
-        return '''def solution(data):
-    return [x * 2 for x in data if x % 2 == 0]
-'''
+        return self._SOLUTION
 
 
 class OOPChallenge(Challenge):
+    _SOLUTION = '''class Solution:
+    def __init__(self):
+        self.data = []
+
+    def process(self, data):
+        return f"Processed: {data}"
+'''
+
     def get_template(self) -> str:
-        return f'''# {self.title}
+        if self._template_cache is None:
+            self._template_cache = f'''# {self.title}
 # {self.description}
 
 class Solution:
@@ -608,24 +1002,44 @@ class Solution:
     def process(self, data):
         return f"Processed: {{data}}"
 '''
-    def get_solution(self) -> str:
-        return '''class Solution:
-    def __init__(self):
-        self.data = []
+        return self._template_cache
 
-    def process(self, data):
-        return f"Processed: {data}"
-'''
+    def get_solution(self) -> str:
+        return self._SOLUTION
+
+
+# Static challenge data: (class, ctor args, ((test_case, expected), ...), hints).
+# Built once at import so constructing PyMaster doesn't re-allocate it.
+_CHALLENGE_SPECS: Tuple[Tuple[type, tuple, Tuple[Tuple[Dict, Any], ...], Tuple[str, ...]], ...] = (
+    (CorePythonChallenge,
+     ("core_001", "Basic Function Implementation",
+      "Implement a function that adds two numbers",
+      1, "core_python", "functions"),
+     (({'function': 'solution', 'args': [2, 3]}, 5),
+      ({'function': 'solution', 'args': [-1, 1]}, 0)),
+     ("Use the + operator",)),
+    (DataStructuresChallenge,
+     ("ds_001", "List Comprehension Practice",
+      "Create a list of even numbers doubled",
+      3, "data_structures", "list_comprehension"),
+     (({'function': 'solution', 'args': [[1, 2, 3, 4, 5]]}, [4, 8]),
+      ({'function': 'solution', 'args': [[1, 3, 5]]}, [])),
+     ()),
+    (OOPChallenge,
+     ("oop_001", "Class Implementation",
+      "Create a class that processes input data",
+      5, "object_oriented", "classes"),
+     # NOTE: dotted target works (Solution().process)
+     (({'function': 'Solution().process', 'args': ["test"]}, "Processed: test"),),
+     ()),
+)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Import new modules
+# Feature modules (gamification / quests / arcade) are imported lazily from
+# their menu handlers so cold start does not pay for modes never opened.
 # ──────────────────────────────────────────────────────────────────────────────
 
-import pymaster_gamification
-import pymaster_quests
-import pymaster_arcade
-
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Main App
@@ -641,37 +1055,17 @@ class PyMaster:
         self.challenges = self._load_challenges()
 
     def _load_challenges(self) -> List[Challenge]:
-        challenges: List[Challenge] = []
-
-        ch1 = CorePythonChallenge(
-            "core_001", "Basic Function Implementation",
-            "Implement a function that adds two numbers",
-            1, "core_python", "functions"
-        )
-        ch1.add_test_case({'function': 'solution', 'args': [2, 3]}, 5)
-        ch1.add_test_case({'function': 'solution', 'args': [-1, 1]}, 0)
-        ch1.add_hint("Use the + operator")
-        challenges.append(ch1)
-
-        ch2 = DataStructuresChallenge(
-            "ds_001", "List Comprehension Practice",
-            "Create a list of even numbers doubled",
-            3, "data_structures", "list_comprehension"
-        )
-        ch2.add_test_case({'function': 'solution', 'args': [[1, 2, 3, 4, 5]]}, [4, 8])
-        ch2.add_test_case({'function': 'solution', 'args': [[1, 3, 5]]}, [])
-        challenges.append(ch2)
-
-        ch3 = OOPChallenge(
-            "oop_001", "Class Implementation",
-            "Create a class that processes input data",
-            5, "object_oriented", "classes"
-        )
-        # NOTE: dotted target works (Solution().process)
-        ch3.add_test_case({'function': 'Solution().process', 'args': ["test"]}, "Processed: test")
-        challenges.append(ch3)
+        return [self._build_challenge(spec) for spec in _CHALLENGE_SPECS]
 
-        return challenges
+    @staticmethod
+    def _build_challenge(spec) -> Challenge:
+        challenge_cls, ctor_args, test_cases, hints = spec
+        challenge = challenge_cls(*ctor_args)
+        for test_case, expected in test_cases:
+            challenge.add_test_case(test_case, expected)
+        for hint in hints:
+            challenge.add_hint(hint)
+        return challenge
 
     def start(self):
         self.console.print(PYMASTER_ART, style="bold blue")
@@ -701,10 +1095,13 @@ class PyMaster:
                 self._exit()
                 break
             elif choice == "5":
+                import pymaster_gamification
                 pymaster_gamification.run_gamification_hub(self.console, self.db_manager, self.current_user)
             elif choice == "6":
+                import pymaster_quests
                 pymaster_quests.run_quest_campaign(self.console, self.db_manager, self.validator, self.current_user)
             elif choice == "7":
+                import pymaster_arcade
                 pymaster_arcade.run_arcade_mode(self.console, self.db_manager, self.validator, self.current_user)
 
     def _start_challenge(self):
@@ -735,14 +1132,15 @@ class PyMaster:
             self.console.print("[red]No code entered. Challenge cancelled.[/red]")
             return
 
-        ok, syn_feedback = CodeAnalyzer.validate_syntax(user_code)
+        bundle = CodeBundle.from_source(user_code)
+        ok, syn_feedback = CodeAnalyzer.validate_syntax(bundle)
         if not ok:
             self.console.print("[red]Syntax Errors:[/red]")
             for e in syn_feedback:
                 self.console.print(f"  [red]{e}[/red]")
             return
 
-        passed, feedback = self.validator.validate_solution(user_code, challenge.test_cases, challenge.expected_outputs)
+        passed, feedback, exec_time = self.validator.validate_solution(user_code, challenge.test_cases, challenge.expected_outputs)
         self.console.print("\n[bold cyan]=== Test Results ===[/bold cyan]")
         for line in feedback:
             if line.startswith("✅"):
@@ -754,14 +1152,11 @@ class PyMaster:
             else:
                 self.console.print(line)
 
-        pep8_score, pep8_fb = CodeAnalyzer.check_pep8(user_code)
+        pep8_score, pep8_fb = CodeAnalyzer.check_pep8(bundle)
         for item in pep8_fb:
             self.console.print(f"[dim]{item}[/dim]")
 
-        # (Optional) simple perf timing via executor roundtrip
-        start = time.time()
-        _ = SafeCodeExecutor(timeout=5).execute(user_code)
-        exec_time = time.time() - start
+        # Perf score from the timing of the validation pass itself
         perf_score = max(0.0, 1.0 - min(exec_time / 2.0, 1.0))  # naive scoring
 
         result = ChallengeResult(
@@ -778,7 +1173,7 @@ class PyMaster:
         self._update_progress(challenge, passed)
 
     def _update_progress(self, challenge: Challenge, passed: bool):
-        prog = self.db_manager.get_user_progress(self.current_user, challenge.module, challenge.concept)
+        prog = self.db_manager.get_user_progress(self.current_user, challenge.module, challenge.concept, limit=1)
         if prog:
             p = prog[0]
             p.attempts += 1
@@ -800,22 +1195,27 @@ class PyMaster:
 
     def _view_progress(self):
         self.console.print("\n[bold cyan]=== Your Progress ===[/bold cyan]")
-        items = self.db_manager.get_user_progress(self.current_user)
+        stats, items, _, _ = self.db_manager.get_user_snapshot(self.current_user)
         if not items:
             self.console.print("[yellow]No progress yet.[/yellow]")
             return
-        table = Table(show_header=True, header_style="bold magenta")
+        # box.SIMPLE skips the per-cell edge drawing of the default box
+        table = Table(show_header=True, header_style="bold magenta", box=box.SIMPLE)
         table.add_column("Module", style="cyan")
         table.add_column("Concept", style="green")
         table.add_column("Attempts", style="yellow")
         table.add_column("Success Rate", style="blue")
         table.add_column("Mastery", style="red")
-        for pr in items:
-            sr = (pr.correct_attempts / pr.attempts * 100) if pr.attempts else 0
-            table.add_row(pr.module, pr.concept, str(pr.attempts), f"{sr:.1f}%", f"{pr.get_mastery_percentage()}%")
+        rows = [
+            (pr.module, pr.concept, str(pr.attempts),
+             f"{(pr.correct_attempts / pr.attempts * 100) if pr.attempts else 0:.1f}%",
+             f"{pr.get_mastery_percentage()}%")
+            for pr in items
+        ]
+        for row in rows:
+            table.add_row(*row)
         self.console.print(table)
 
-        stats = self.db_manager.get_user_stats(self.current_user)
         self.console.print(f"\n[bold]Overall Stats:[/bold]")
         self.console.print(f"Total Challenges: {stats['total_challenges']}")
         self.console.print(f"Success Rate: {stats['success_rate']:.1f}%")
@@ -826,13 +1226,13 @@ class PyMaster:
         reports_dir = Path(CONFIG['REPORTS_DIR'])
         reports_dir.mkdir(exist_ok=True)
 
-        progress_list = self.db_manager.get_user_progress(self.current_user)
-        stats = self.db_manager.get_user_stats(self.current_user)
+        stats, progress_list, _, _ = self.db_manager.get_user_snapshot(self.current_user)
 
-        content = f"""# PyMaster Progress Report
+        now = datetime.now()
+        header = f"""# PyMaster Progress Report
 
 ## User: {self.current_user}
-## Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+## Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Overall Statistics
 - Total Challenges: {stats['total_challenges']}
@@ -844,18 +1244,25 @@ class PyMaster:
 
 ## Progress by Module/Concept
 """
-        for p in progress_list:
-            sr = (p.correct_attempts / p.attempts * 100) if p.attempts else 0
-            content += f"- {p.module}/{p.concept}: {p.attempts} attempts, {sr:.1f}% success, {p.get_mastery_percentage()}% mastery\n"
-
-        fname = reports_dir / f"pymaster_report_{self.current_user}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-        with open(fname, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Join once instead of growing `content` with += per row
+        lines = [
+            f"- {p.module}/{p.concept}: {p.attempts} attempts, "
+            f"{(p.correct_attempts / p.attempts * 100) if p.attempts else 0:.1f}% success, "
+            f"{p.get_mastery_percentage()}% mastery"
+            for p in progress_list
+        ]
+        content = header + "\n".join(lines) + "\n"
+
+        fname = reports_dir / f"pymaster_report_{self.current_user}_{now.strftime('%Y%m%d_%H%M%S')}.md"
+        # Encode once and write bytes directly; skips the TextIOWrapper
+        # incremental-encoder layer
+        fname.write_bytes(content.encode("utf-8"))
         self.console.print(f"[green]Report saved to: {fname}[/green]")
 
     def _exit(self):
         if self.session_id:
             self.db_manager.end_session(self.session_id, 0)
+        self.db_manager.close()
         self.console.print("\n[bold green]Thank you for using PyMaster! Arrivederci![/bold green]")
 
 
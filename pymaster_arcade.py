@@ -1,10 +1,12 @@
 # pymaster_arcade.py
 
+import functools
+import sys
 import time
 import random
 from typing import List, Dict, Any, Tuple
 from dataclasses import dataclass
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 from rich.prompt import Prompt
@@ -13,37 +15,39 @@ from datetime import datetime
 
 # Import at module level to avoid circular import issues
 try:
-    from pymaster import CodeAnalyzer, ChallengeResult
+    from pymaster import CodeAnalyzer, ChallengeResult, CodeBundle
 except ImportError:
     # Fallback for type checking or when pymaster is not available
     CodeAnalyzer = None
     ChallengeResult = None
+    CodeBundle = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArcadeChallenge:
     """Lightweight challenge class for arcade mode"""
     id: str
     title: str
     description: str
     function_name: str
-    test_cases: List[Dict]
-    expected_outputs: List[Any]
+    test_cases: Tuple[Dict, ...]
+    expected_outputs: Tuple[Any, ...]
     template: str
 
-def create_arcade_challenges() -> List[ArcadeChallenge]:
-    """Create a pool of arcade challenges"""
-    challenges = [
+@functools.lru_cache(maxsize=1)
+def create_arcade_challenges() -> Tuple[ArcadeChallenge, ...]:
+    """Create the pool of arcade challenges (built once, shared by every session)"""
+    challenges = (
         ArcadeChallenge(
             id="arcade_001",
             title="Quick Sum",
             description="Create a function that returns the sum of two integers",
             function_name="solution",
-            test_cases=[
+            test_cases=(
                 {'function': 'solution', 'args': [1, 2]},
                 {'function': 'solution', 'args': [-5, 10]},
                 {'function': 'solution', 'args': [0, 0]}
-            ],
-            expected_outputs=[3, 5, 0],
+            ),
+            expected_outputs=(3, 5, 0),
             template="""def solution(a: int, b: int) -> int:
     # Return the sum of a and b
     pass"""
@@ -53,12 +57,12 @@ def create_arcade_challenges() -> List[ArcadeChallenge]:
             title="Even Numbers",
             description="Return a list of even numbers from the input list",
             function_name="solution",
-            test_cases=[
+            test_cases=(
                 {'function': 'solution', 'args': [[1, 2, 3, 4, 5]]},
                 {'function': 'solution', 'args': [[1, 3, 5]]},
                 {'function': 'solution', 'args': [[2, 4, 6, 8]]}
-            ],
-            expected_outputs=[[2, 4], [], [2, 4, 6, 8]],
+            ),
+            expected_outputs=([2, 4], [], [2, 4, 6, 8]),
             template="""def solution(numbers: List[int]) -> List[int]:
     # Return only the even numbers from the input list
     pass"""
@@ -68,12 +72,12 @@ def create_arcade_challenges() -> List[ArcadeChallenge]:
             title="String Reverser",
             description="Reverse the input string",
             function_name="solution",
-            test_cases=[
+            test_cases=(
                 {'function': 'solution', 'args': ["hello"]},
                 {'function': 'solution', 'args': ["Python"]},
                 {'function': 'solution', 'args': [""]}
-            ],
-            expected_outputs=["olleh", "nohtyP", ""],
+            ),
+            expected_outputs=("olleh", "nohtyP", ""),
             template="""def solution(s: str) -> str:
     # Return the reversed string
     pass"""
@@ -83,12 +87,12 @@ def create_arcade_challenges() -> List[ArcadeChallenge]:
             title="Max Value",
             description="Find the maximum value in a list of integers",
             function_name="solution",
-            test_cases=[
+            test_cases=(
                 {'function': 'solution', 'args': [[1, 5, 3, 9, 2]]},
                 {'function': 'solution', 'args': [[-1, -5, -3]]},
                 {'function': 'solution', 'args': [[42]]}
-            ],
-            expected_outputs=[9, -1, 42],
+            ),
+            expected_outputs=(9, -1, 42),
             template="""def solution(numbers: List[int]) -> int:
     # Return the maximum value in the list
     pass"""
@@ -98,35 +102,40 @@ def create_arcade_challenges() -> List[ArcadeChallenge]:
             title="Word Counter",
             description="Count the number of words in a sentence",
             function_name="solution",
-            test_cases=[
+            test_cases=(
                 {'function': 'solution', 'args': ["Hello world"]},
                 {'function': 'solution', 'args': ["Python is awesome"]},
                 {'function': 'solution', 'args': [""]}
-            ],
-            expected_outputs=[2, 3, 0],
+            ),
+            expected_outputs=(2, 3, 0),
             template="""def solution(sentence: str) -> int:
     # Return the number of words in the sentence
     pass"""
         )
-    ]
+    )
     return challenges
 
+# First codepoint of a feedback line → Rich style (O(1) dispatch instead of
+# a startswith chain per line)
+_FEEDBACK_STYLE = {'✅': 'green', '❌': 'red', '🎉': 'bold green'}
+
 def get_user_code(console: Console, challenge: ArcadeChallenge) -> str:
     """Get user code input for a challenge"""
     console.print(Panel(challenge.template, title="Code Template", border_style="bright_blue"))
     
     console.print("\n[bold bright_yellow]Enter your solution (type 'END' alone on a line to finish):[/bold bright_yellow]")
+    # Iterate the buffered stdin stream instead of calling input() per line:
+    # one readline layer, no per-line prompt handling.
     lines = []
-    while True:
-        try:
-            line = input()
+    try:
+        for line in sys.stdin:
             if line.strip() == "END":
                 break
             lines.append(line)
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Input cancelled.[/yellow]")
-            return ""
-    return "\n".join(lines).strip()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Input cancelled.[/yellow]")
+        return ""
+    return "".join(lines).strip()
 
 def run_arcade_challenge(console: Console, validator: 'ChallengeValidator', 
                         challenge: ArcadeChallenge) -> Tuple[bool, float, List[str]]:
@@ -140,8 +149,10 @@ def run_arcade_challenge(console: Console, validator: 'ChallengeValidator',
     if not user_code:
         return False, 0, ["Challenge skipped"]
     
-    # Validate syntax
-    ok, syn_feedback = CodeAnalyzer.validate_syntax(user_code)
+    # Validate syntax — CodeBundle parses through the warm AST cache, so a
+    # resubmitted (or retried) solution never pays for a second parse
+    bundle = CodeBundle.from_source(user_code)
+    ok, syn_feedback = CodeAnalyzer.validate_syntax(bundle)
     if not ok:
         console.print("[red]❌ Syntax Errors:[/red]")
         for e in syn_feedback:
@@ -149,21 +160,16 @@ def run_arcade_challenge(console: Console, validator: 'ChallengeValidator',
         return False, time.time() - start_time, syn_feedback
     
     # Validate solution
-    passed, feedback = validator.validate_solution(
+    passed, feedback, _ = validator.validate_solution(
         user_code, challenge.test_cases, challenge.expected_outputs
     )
     
-    # Display results
+    # Display results — style per line via dict lookup, one print for all
     console.print("\n[bold bright_cyan]=== Test Results ===[/bold bright_cyan]")
+    results_text = Text()
     for line in feedback:
-        if line.startswith("✅"):
-            console.print(f"[green]{line}[/green]")
-        elif line.startswith("❌"):
-            console.print(f"[red]{line}[/red]")
-        elif line.startswith("🎉"):
-            console.print(f"[bold green]{line}[/bold green]")
-        else:
-            console.print(line)
+        results_text.append(line + "\n", style=_FEEDBACK_STYLE.get(line[:1]))
+    console.print(results_text)
     
     execution_time = time.time() - start_time
     return passed, execution_time, feedback
@@ -172,10 +178,14 @@ def show_arcade_summary(console: Console, stats: Dict[str, Any], username: str):
     """Show the arcade mode summary screen"""
     console.clear()
     
+    # Collect the panels and print the screen in one go — one Rich render
+    # instead of three.
+    renderables = []
+
     # Big title
     title = Text("🎮 ARCADE MODE COMPLETE 🎮", style="bold magenta")
-    console.print(Panel(title, border_style="bright_magenta"))
-    
+    renderables.append(Panel(title, border_style="bright_magenta"))
+
     # Stats panel
     stats_text = Text()
     stats_text.append(f"Player: ", style="bright_cyan")
@@ -201,8 +211,8 @@ def show_arcade_summary(console: Console, stats: Dict[str, Any], username: str):
     avg_time = stats['total_time'] / stats['attempted'] if stats['attempted'] > 0 else 0
     stats_text.append(f"{avg_time:.2f} seconds", style="bold yellow")
     
-    console.print(Panel(stats_text, title="📊 Your Performance", border_style="bright_blue"))
-    
+    renderables.append(Panel(stats_text, title="📊 Your Performance", border_style="bright_blue"))
+
     # Achievement message
     if stats['solved'] >= 5:
         achievement = "🏆 Coding Master!"
@@ -213,9 +223,10 @@ def show_arcade_summary(console: Console, stats: Dict[str, Any], username: str):
     else:
         achievement = "🌱 Keep Practicing!"
     
-    console.print(Panel(f"[bold bright_yellow]{achievement}[/bold bright_yellow]", 
+    renderables.append(Panel(f"[bold bright_yellow]{achievement}[/bold bright_yellow]",
                        border_style="bright_green"))
-    
+
+    console.print(Group(*renderables))
     console.print("\n[italic dim]Press Enter to return to the main menu...[/italic dim]")
     input()
 
@@ -241,13 +252,18 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
     
     # Initialize game state
     challenges = create_arcade_challenges()
+    # Pre-shuffled deck: no per-round RNG call and no back-to-back repeats
+    deck = list(challenges)
+    random.shuffle(deck)
+    deck_pos = 0
     start_time = time.time()
     attempted = 0
     solved = 0
     current_streak = 0
     best_streak = 0
     total_time = 0.0
-    challenge_times = []
+    pending_results: List[ChallengeResult] = []
+    last_rendered = None  # (seconds left, solved, streak, round) of last draw
     
     console.print(f"\n[bold bright_green]🏁 Starting {duration//60}-minute coding sprint![/bold bright_green]")
     console.print("[dim]Press Ctrl+C at any time to exit early[/dim]")
@@ -260,29 +276,37 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
             if remaining_time <= 0:
                 break
                 
-            # Select random challenge
-            challenge = random.choice(challenges)
-            
-            # Display round info
-            console.clear()
-            round_title = Text(f"🕹️  ROUND {attempted + 1}", style="bold bright_blue")
-            console.print(Panel(round_title, border_style="bright_blue"))
+            # Draw the next challenge; reshuffle once the deck is exhausted
+            if deck_pos == len(deck):
+                random.shuffle(deck)
+                deck_pos = 0
+            challenge = deck[deck_pos]
+            deck_pos += 1
             
-            # Show stats
-            stats_text = Text()
-            stats_text.append(f"⏱️  Time Remaining: ", style="bright_yellow")
-            stats_text.append(f"{remaining_time:.0f}s\n", style="bold white")
-            stats_text.append(f"🔥 Current Streak: ", style="bright_yellow")
-            stats_text.append(f"{current_streak}\n", style="bold white")
-            stats_text.append(f"✅ Solved: ", style="bright_yellow")
-            stats_text.append(f"{solved}/{attempted} challenges\n", style="bold white")
-            
-            if attempted > 0:
-                avg_time = sum(challenge_times) / len(challenge_times)
-                stats_text.append(f"⏱️  Avg Time: ", style="bright_yellow")
-                stats_text.append(f"{avg_time:.2f}s/challenge", style="bold white")
-            
-            console.print(Panel(stats_text, border_style="bright_green"))
+            # Display round info — skip the clear+redraw entirely when
+            # nothing visible has changed since the last draw
+            render_key = (int(remaining_time), solved, current_streak, attempted)
+            if render_key != last_rendered:
+                console.clear()
+                round_title = Text(f"🕹️  ROUND {attempted + 1}", style="bold bright_blue")
+                console.print(Panel(round_title, border_style="bright_blue"))
+
+                # Show stats
+                stats_text = Text()
+                stats_text.append(f"⏱️  Time Remaining: ", style="bright_yellow")
+                stats_text.append(f"{remaining_time:.0f}s\n", style="bold white")
+                stats_text.append(f"🔥 Current Streak: ", style="bright_yellow")
+                stats_text.append(f"{current_streak}\n", style="bold white")
+                stats_text.append(f"✅ Solved: ", style="bright_yellow")
+                stats_text.append(f"{solved}/{attempted} challenges\n", style="bold white")
+
+                if attempted > 0:
+                    avg_time = total_time / attempted
+                    stats_text.append(f"⏱️  Avg Time: ", style="bright_yellow")
+                    stats_text.append(f"{avg_time:.2f}s/challenge", style="bold white")
+
+                console.print(Panel(stats_text, border_style="bright_green"))
+                last_rendered = render_key
             
             # Run the challenge
             passed, exec_time, feedback = run_arcade_challenge(console, validator, challenge)
@@ -290,8 +314,7 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
             # Update stats
             attempted += 1
             total_time += exec_time
-            challenge_times.append(exec_time)
-            
+
             if passed:
                 solved += 1
                 current_streak += 1
@@ -301,7 +324,8 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
                 current_streak = 0
                 console.print("[bold red]❌ Challenge failed.[/bold red]")
             
-            # Save result to database
+            # Collect the result; all rounds are written in one
+            # transaction after the sprint (one fsync instead of N)
             result = ChallengeResult(
                 challenge_id=challenge.id,
                 user_code="",  # We don't store user code in arcade mode for privacy
@@ -312,8 +336,8 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
                 execution_time=exec_time,
                 feedback=feedback
             )
-            db.save_challenge_result(result, username)
-            
+            pending_results.append(result)
+
             # Pause before next round
             if time.time() - start_time < duration:
                 console.print("\n[bold bright_cyan]Preparing next challenge...[/bold bright_cyan]")
@@ -321,7 +345,9 @@ def run_arcade_mode(console: Console, db: 'DatabaseManager', validator: 'Challen
     
     except KeyboardInterrupt:
         console.print("\n\n[yellow] Arcade mode interrupted by user.[/yellow]")
-    
+    finally:
+        db.save_challenge_results_bulk(pending_results, username)
+
     # Show summary
     final_stats = {
         'duration': time.time() - start_time,
@@ -1,11 +1,15 @@
 # pymaster_gamification.py
 
 from typing import List, Dict, Any
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
-import sqlite3
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to the pure-Python path
+    np = None
 
 # Badge definitions
 BADGES = {
@@ -17,8 +21,36 @@ BADGES = {
     "level_up": {"name": "Level Up! 📈", "description": "Reach level 2 or higher", "emoji": "📈"},
 }
 
+def _badge_desc_text(badge: Dict[str, str]) -> Text:
+    text = Text()
+    text.append(f"{badge['emoji']} ", style="yellow")
+    text.append(f"{badge['name']}: ", style="cyan")
+    text.append(f"{badge['description']}\n", style="white")
+    return text
+
+# Pre-rendered Text fragments per badge; the hub render just appends these
+# instead of re-walking BADGES and re-styling on every visit
+BADGE_HEADER_TEXT = {key: Text(f"{badge['emoji']} {badge['name']}  ", style="bold yellow")
+                     for key, badge in BADGES.items()}
+BADGE_DESC_TEXT = {key: _badge_desc_text(badge) for key, badge in BADGES.items()}
+
+def _result_arrays(challenge_results: List[Dict[str, Any]]):
+    """Columnar NumPy view of the result dicts (passed, pep8, perf, time)."""
+    n = len(challenge_results)
+    passed = np.fromiter((bool(r.get('passed')) for r in challenge_results), dtype=bool, count=n)
+    pep8 = np.fromiter((r.get('pep8_score', 0) for r in challenge_results), dtype=np.float32, count=n)
+    perf = np.fromiter((r.get('performance_score', 0) for r in challenge_results), dtype=np.float32, count=n)
+    exec_t = np.fromiter((r.get('execution_time', 1) for r in challenge_results), dtype=np.float32, count=n)
+    return passed, pep8, perf, exec_t
+
 def calculate_xp(challenge_results: List[Dict[str, Any]]) -> int:
     """Calculate total XP based on challenge results"""
+    if np is not None and challenge_results:
+        passed, pep8, perf, _ = _result_arrays(challenge_results)
+        return int(10 * len(challenge_results)
+                   + 40 * passed.sum()
+                   + 10 * (pep8 > 0.8).sum()
+                   + 10 * (perf > 0.8).sum())
     xp = 0
     for result in challenge_results:
         xp += 10  # Base XP for attempt
@@ -31,23 +63,59 @@ def calculate_xp(challenge_results: List[Dict[str, Any]]) -> int:
             xp += 10
     return xp
 
+def calculate_xp_from_aggregates(agg: Dict[str, int]) -> int:
+    """XP from the SQL-side aggregate counts — O(1) regardless of history size."""
+    return (10 * agg['attempts']
+            + 40 * agg['passed']
+            + 10 * agg['high_pep8']
+            + 10 * agg['high_performance'])
+
+def get_user_badges_from_aggregates(agg: Dict[str, int], level: int) -> List[str]:
+    """Badge keys from the SQL-side aggregate counts."""
+    badges = []
+    if agg['attempts'] >= 1:
+        badges.append("first_blood")
+    if agg['attempts'] >= 3:
+        badges.append("streak_starter")
+    if level >= 2:
+        badges.append("level_up")
+    if agg['high_pep8']:
+        badges.append("style_seeker")
+    if agg['fast']:
+        badges.append("speed_demon")
+    if agg['perfect']:
+        badges.append("perfectionist")
+    return badges
+
+# 128 XP per level: a power-of-two scale lets the level math use shifts
+# and masks instead of divmod
+LEVEL_BITS = 7
+LEVEL_SIZE = 1 << LEVEL_BITS
+
 def get_level_from_xp(xp: int) -> int:
     """Convert XP to level"""
-    return 1 + xp // 100
+    return 1 + (xp >> LEVEL_BITS)
 
 def get_xp_for_next_level(level: int) -> int:
     """Get XP required for next level"""
-    return level * 100
+    return level << LEVEL_BITS
 
 def get_xp_progress_in_level(xp: int, level: int) -> int:
     """Get XP progress within current level"""
-    return xp % 100
+    return xp & (LEVEL_SIZE - 1)
+
+# Full/empty bar templates per width; slicing them beats rebuilding the
+# bar with string multiplication on every call
+_BAR_CACHE: Dict[int, tuple] = {}
 
 def create_progress_bar(progress: int, total: int, width: int = 20) -> str:
     """Create a visual progress bar"""
     filled = int((progress / total) * width) if total > 0 else 0
-    bar = "█" * filled + "░" * (width - filled)
-    return f"[{bar}] {progress}/{total}"
+    templates = _BAR_CACHE.get(width)
+    if templates is None:
+        templates = _BAR_CACHE[width] = ("█" * width, "░" * width)
+    full, empty = templates
+    return f"[{full[:filled]}{empty[filled:]}] {progress}/{total}"
 
 def get_user_badges(challenge_results: List[Dict[str, Any]], level: int) -> List[str]:
     """Determine which badges user has earned"""
@@ -63,55 +131,65 @@ def get_user_badges(challenge_results: List[Dict[str, Any]], level: int) -> List
         badges.append("level_up")
     
     # Check for high scores in any challenge
-    for result in challenge_results:
-        if result.get('pep8_score', 0) > 0.8:
+    if np is not None and challenge_results:
+        passed, pep8, perf, exec_t = _result_arrays(challenge_results)
+        if (pep8 > 0.8).any():
             badges.append("style_seeker")
-        if result.get('execution_time', 1) < 0.5:
+        if (exec_t < 0.5).any():
             badges.append("speed_demon")
-        if (result.get('passed') and 
-            result.get('pep8_score', 0) >= 1.0 and 
-            result.get('performance_score', 0) >= 1.0):
+        if (passed & (pep8 >= 1.0) & (perf >= 1.0)).any():
             badges.append("perfectionist")
-    
-    # Remove duplicates while preserving order
-    return list(dict.fromkeys(badges))
+    else:
+        # Each badge is awarded at most once, so test only the ones still
+        # missing and stop scanning as soon as all three have hit
+        have = set()
+        for result in challenge_results:
+            if "style_seeker" not in have and result.get('pep8_score', 0) > 0.8:
+                have.add("style_seeker")
+                badges.append("style_seeker")
+            if "speed_demon" not in have and result.get('execution_time', 1) < 0.5:
+                have.add("speed_demon")
+                badges.append("speed_demon")
+            if ("perfectionist" not in have and
+                result.get('passed') and
+                result.get('pep8_score', 0) >= 1.0 and
+                result.get('performance_score', 0) >= 1.0):
+                have.add("perfectionist")
+                badges.append("perfectionist")
+            if len(have) == 3:
+                break
+
+    return badges
 
 def run_gamification_hub(console: Console, db: 'DatabaseManager', username: str) -> None:
     """Render an interactive gamification dashboard for the given user."""
     
     console.clear()
-    
+
+    # Accumulate every panel and print the whole screen once at the end:
+    # each console.print runs Rich's full render pipeline, so one Group
+    # render is much cheaper than six sequential ones.
+    renderables = []
+
     # Title
     title = Text("🎮 GAMIFICATION HUB 🎮", style="bold magenta")
-    console.print(Panel(title, border_style="bright_magenta"))
-    
-    # Get user data
+    renderables.append(Panel(title, border_style="bright_magenta"))
+
+    # Get user data — one cached fetch shared with the other render paths;
+    # only the 5 displayed rows are materialized, XP comes from aggregates
     try:
-        # Get all challenge results for this user
-        conn = sqlite3.connect(db.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM challenge_results WHERE user_id = ? ORDER BY created_at DESC", 
-            (username,)
-        )
-        raw_challenge_results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
+        stats, _, recent_results, xp_aggregates = db.get_user_snapshot(username)
     except Exception as e:
         console.print(Panel(f"Error loading user data: {e}", border_style="red"))
         input("\nPress Enter to return to main menu...")
         return
-    
+
     # Calculate XP and level
-    total_xp = calculate_xp(raw_challenge_results)
+    total_xp = calculate_xp_from_aggregates(xp_aggregates)
     current_level = get_level_from_xp(total_xp)
     xp_for_next = get_xp_for_next_level(current_level)
     xp_in_level = get_xp_progress_in_level(total_xp, current_level)
-    
-    # User stats panel
-    stats = db.get_user_stats(username)
-    
+
     stats_text = Text()
     stats_text.append(f"Total Challenges: ", style="cyan")
     stats_text.append(f"{stats['total_challenges']}\n", style="bold white")
@@ -128,7 +206,7 @@ def run_gamification_hub(console: Console, db: 'DatabaseManager', username: str)
     stats_text.append(f"Average Performance Score: ", style="cyan")
     stats_text.append(f"{stats['avg_performance_score']:.1f}%", style="bold white")
     
-    console.print(Panel(stats_text, title="📊 Stats Overview", border_style="bright_blue"))
+    renderables.append(Panel(stats_text, title="📊 Stats Overview", border_style="bright_blue"))
     
     # XP and Level panel
     xp_text = Text()
@@ -141,14 +219,14 @@ def run_gamification_hub(console: Console, db: 'DatabaseManager', username: str)
     xp_text.append(f"Next Level: ", style="green")
     xp_text.append(f"{xp_for_next} XP\n", style="bold yellow")
     
-    progress_bar = create_progress_bar(xp_in_level, 100)
+    progress_bar = create_progress_bar(xp_in_level, LEVEL_SIZE)
     xp_text.append(f"Progress: ", style="green")
     xp_text.append(f"{progress_bar}", style="bold white")
     
-    console.print(Panel(xp_text, title="⭐ Experience Points", border_style="bright_green"))
+    renderables.append(Panel(xp_text, title="⭐ Experience Points", border_style="bright_green"))
     
     # Recent activity
-    if raw_challenge_results:
+    if recent_results:
         table = Table(title="🕒 Recent Activity", border_style="yellow")
         table.add_column("Challenge ID", style="cyan")
         table.add_column("Passed", style="green")
@@ -157,8 +235,8 @@ def run_gamification_hub(console: Console, db: 'DatabaseManager', username: str)
         table.add_column("Time (s)", style="red")
         table.add_column("Date", style="dim")
         
-        # Show last 5 challenges
-        for result in raw_challenge_results[:5]:
+        # The snapshot already limits to the 5 rendered rows
+        for result in recent_results:
             passed = "✅" if result.get('passed') else "❌"
             pep8 = f"{result.get('pep8_score', 0) * 100:.0f}%"
             perf = f"{result.get('performance_score', 0) * 100:.0f}%"
@@ -174,36 +252,34 @@ def run_gamification_hub(console: Console, db: 'DatabaseManager', username: str)
                 date
             )
         
-        console.print(table)
+        renderables.append(table)
     else:
-        console.print(Panel("No recent activity", title="🕒 Recent Activity", border_style="yellow"))
+        renderables.append(Panel("No recent activity", title="🕒 Recent Activity", border_style="yellow"))
     
     # Badges section
-    earned_badges = get_user_badges(raw_challenge_results, current_level)
+    earned_badges = get_user_badges_from_aggregates(xp_aggregates, current_level)
     
     if earned_badges:
         badges_text = Text()
         for badge_key in earned_badges:
-            badge = BADGES.get(badge_key, {})
-            badges_text.append(f"{badge.get('emoji', '🏆')} {badge.get('name', badge_key)}  ", style="bold yellow")
-        
+            badges_text.append_text(BADGE_HEADER_TEXT[badge_key])
+
         # Add a line break for better formatting
         badges_text.append("\n\n")
-        
+
         # Add descriptions
         for badge_key in earned_badges:
-            badge = BADGES.get(badge_key, {})
-            badges_text.append(f"{badge.get('emoji')} ", style="yellow")
-            badges_text.append(f"{badge.get('name', badge_key)}: ", style="cyan")
-            badges_text.append(f"{badge.get('description', '')}\n", style="white")
-        
-        console.print(Panel(badges_text, title="🏅 Achievements", border_style="bright_yellow"))
+            badges_text.append_text(BADGE_DESC_TEXT[badge_key])
+
+        renderables.append(Panel(badges_text, title="🏅 Achievements", border_style="bright_yellow"))
     else:
-        console.print(Panel("Complete more challenges to earn badges!", 
-                           title="🏅 Achievements", border_style="bright_yellow"))
-    
+        renderables.append(Panel("Complete more challenges to earn badges!",
+                                 title="🏅 Achievements", border_style="bright_yellow"))
+
     # Footer
-    console.print(Panel("Keep coding to earn more XP and unlock achievements!", 
-                       border_style="magenta"))
-    
+    renderables.append(Panel("Keep coding to earn more XP and unlock achievements!",
+                             border_style="magenta"))
+
+    console.print(Group(*renderables))
+
     input("\nPress Enter to return to main menu...")
@@ -1,191 +1,327 @@
 # pymaster_quests.py
 
-import json
-import os
-import sqlite3
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Any
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.text import Text
-from datetime import datetime
+
+# Zones and steps are immutable campaign data; NamedTuples give the render
+# loops C-level attribute access instead of a dict hash per field read
+class Step(NamedTuple):
+    id: str
+    title: str
+    description: str
+    challenge_id: Optional[str]
+    narrative: str
+
+class Zone(NamedTuple):
+    name: str
+    color: str
+    emoji: str
+    description: str
+    steps: Tuple[Step, ...]
 
 # Quest campaign data
-ZONES = {
-    "green_valley": {
-        "name": "Green Valley 🌱",
-        "color": "green",
-        "emoji": "🌱",
-        "description": "Master the fundamentals of Python programming",
-        "steps": [
-            {
-                "id": "gv_step1",
-                "title": "The First Function",
-                "description": "Write your first Python function to add two numbers together.",
-                "challenge_id": "core_001",
-                "narrative": "Welcome to Green Valley, young programmer! Your journey begins with the most fundamental concept - functions. Create a function that takes two parameters and returns their sum."
-            },
-            {
-                "id": "gv_step2",
-                "title": "String Manipulation",
-                "description": "Process text strings to extract specific information.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "In the meadows of Green Valley, you encounter ancient texts that need processing. Your task is to manipulate strings to extract meaningful information."
-            },
-            {
-                "id": "gv_step3",
-                "title": "List Basics",
-                "description": "Work with lists to store and manipulate collections of data.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "The villagers of Green Valley need help organizing their harvest. Use your list skills to manage collections of fruits and vegetables."
-            }
-        ]
-    },
-    "azure_city": {
-        "name": "Azure City 🏙️",
-        "color": "cyan",
-        "emoji": "🏙️",
-        "description": "Dive into data structures and advanced list operations",
-        "steps": [
-            {
-                "id": "ac_step1",
-                "title": "List Comprehensions",
-                "description": "Use list comprehensions to filter and transform data efficiently.",
-                "challenge_id": "ds_001",
-                "narrative": "Welcome to the technological heart of Python land - Azure City! Here, efficiency is key. Master list comprehensions to process data like a pro."
-            },
-            {
-                "id": "ac_step2",
-                "title": "Dictionary Operations",
-                "description": "Manipulate dictionaries to store key-value relationships.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "The city's database systems require your expertise with dictionaries. Organize citizen records using key-value pairs."
-            },
-            {
-                "id": "ac_step3",
-                "title": "Data Processing Challenge",
-                "description": "Combine multiple data structures to solve a complex problem.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "The mayor of Azure City has a special task for you. Process complex datasets using all the skills you've learned."
-            }
-        ]
-    },
-    "scarlet_tower": {
-        "name": "Scarlet Tower 🗼",
-        "color": "red",
-        "emoji": "🗼",
-        "description": "Conquer object-oriented programming and class design",
-        "steps": [
-            {
-                "id": "st_step1",
-                "title": "Class Creation",
-                "description": "Design and implement your first Python class.",
-                "challenge_id": "oop_001",
-                "narrative": "At the top of Scarlet Tower, you'll master the art of Object-Oriented Programming. Begin by creating your first class with attributes and methods."
-            },
-            {
-                "id": "st_step2",
-                "title": "Inheritance",
-                "description": "Use inheritance to create specialized classes.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "The ancient wizards of Scarlet Tower used inheritance to pass down magical knowledge. Create class hierarchies to organize your code."
-            },
-            {
-                "id": "st_step3",
-                "title": "Design Patterns",
-                "description": "Implement common design patterns in Python.",
-                "challenge_id": None,  # Placeholder for future challenge
-                "narrative": "Your final challenge in Scarlet Tower is to implement proven design patterns that make your code robust and maintainable."
-            }
-        ]
-    }
+ZONES: Dict[str, Zone] = {
+    "green_valley": Zone(
+        name="Green Valley 🌱",
+        color="green",
+        emoji="🌱",
+        description="Master the fundamentals of Python programming",
+        steps=(
+            Step(
+                id="gv_step1",
+                title="The First Function",
+                description="Write your first Python function to add two numbers together.",
+                challenge_id="core_001",
+                narrative="Welcome to Green Valley, young programmer! Your journey begins with the most fundamental concept - functions. Create a function that takes two parameters and returns their sum."
+            ),
+            Step(
+                id="gv_step2",
+                title="String Manipulation",
+                description="Process text strings to extract specific information.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="In the meadows of Green Valley, you encounter ancient texts that need processing. Your task is to manipulate strings to extract meaningful information."
+            ),
+            Step(
+                id="gv_step3",
+                title="List Basics",
+                description="Work with lists to store and manipulate collections of data.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="The villagers of Green Valley need help organizing their harvest. Use your list skills to manage collections of fruits and vegetables."
+            ),
+        )
+    ),
+    "azure_city": Zone(
+        name="Azure City 🏙️",
+        color="cyan",
+        emoji="🏙️",
+        description="Dive into data structures and advanced list operations",
+        steps=(
+            Step(
+                id="ac_step1",
+                title="List Comprehensions",
+                description="Use list comprehensions to filter and transform data efficiently.",
+                challenge_id="ds_001",
+                narrative="Welcome to the technological heart of Python land - Azure City! Here, efficiency is key. Master list comprehensions to process data like a pro."
+            ),
+            Step(
+                id="ac_step2",
+                title="Dictionary Operations",
+                description="Manipulate dictionaries to store key-value relationships.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="The city's database systems require your expertise with dictionaries. Organize citizen records using key-value pairs."
+            ),
+            Step(
+                id="ac_step3",
+                title="Data Processing Challenge",
+                description="Combine multiple data structures to solve a complex problem.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="The mayor of Azure City has a special task for you. Process complex datasets using all the skills you've learned."
+            ),
+        )
+    ),
+    "scarlet_tower": Zone(
+        name="Scarlet Tower 🗼",
+        color="red",
+        emoji="🗼",
+        description="Conquer object-oriented programming and class design",
+        steps=(
+            Step(
+                id="st_step1",
+                title="Class Creation",
+                description="Design and implement your first Python class.",
+                challenge_id="oop_001",
+                narrative="At the top of Scarlet Tower, you'll master the art of Object-Oriented Programming. Begin by creating your first class with attributes and methods."
+            ),
+            Step(
+                id="st_step2",
+                title="Inheritance",
+                description="Use inheritance to create specialized classes.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="The ancient wizards of Scarlet Tower used inheritance to pass down magical knowledge. Create class hierarchies to organize your code."
+            ),
+            Step(
+                id="st_step3",
+                title="Design Patterns",
+                description="Implement common design patterns in Python.",
+                challenge_id=None,  # Placeholder for future challenge
+                narrative="Your final challenge in Scarlet Tower is to implement proven design patterns that make your code robust and maintainable."
+            ),
+        )
+    ),
 }
 
-def init_campaign_database(db_path: str):
-    """Initialize the campaign progress table in the database"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS campaign_progress (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            zone_id TEXT NOT NULL,
-            step_id TEXT NOT NULL,
-            completed BOOLEAN DEFAULT FALSE,
-            completed_at TIMESTAMP,
-            UNIQUE(user_id, zone_id, step_id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+# Lookup structures derived from ZONES once at import; the menu loops and
+# render paths read these instead of re-walking the nested structures per tick
+ZONE_IDS = tuple(ZONES)
+ZONE_STEP_IDS = {zone_id: tuple(step.id for step in zone.steps)
+                 for zone_id, zone in ZONES.items()}
+ZONE_STEP_COUNT = {zone_id: len(zone.steps) for zone_id, zone in ZONES.items()}
+
+# step index -> id of the step that must be completed first (None for the
+# first step); saves re-indexing steps[i-2].id in the render loops
+PREV_STEP_ID = {zone_id: (None,) + step_ids[:-1]
+                for zone_id, step_ids in ZONE_STEP_IDS.items()}
+
+# Style strings and header text per zone, built once instead of
+# re-interpolating f"bold {color}" and emoji headers on every render
+ZONE_STYLES = {zone_id: {
+    'title': f"bold {zone.color}",
+    'border': zone.color,
+    'header': f"{zone.emoji} {zone.name}",
+} for zone_id, zone in ZONES.items()}
+
+# _CHOICES[n] is the ("1", ..., "n") choice list for an n-item menu; the
+# menu loop indexes this instead of rebuilding the str list per iteration
+_CHOICES = [[str(i) for i in range(1, n + 1)] for n in range(0, 16)]
+
+# zone_id -> (required zone, completed steps needed there) to unlock it
+_UNLOCK_REQUIREMENTS = {
+    "azure_city": ("green_valley", 1),
+    "scarlet_tower": ("azure_city", 1),
+}
+
+# Databases whose campaign schema has already been ensured this process;
+# warm entries into the campaign menu skip the DDL round-trip entirely
+_INITIALIZED: Set[str] = set()
+
+# WITHOUT ROWID keyed on the natural (user_id, zone_id, step_id) tuple:
+# the table is its own index, so every point lookup and upsert touches a
+# single B-tree and no synthetic rowid or duplicate UNIQUE tree is stored
+_DDL_CAMPAIGN_PROGRESS = '''
+    CREATE TABLE IF NOT EXISTS campaign_progress (
+        user_id TEXT NOT NULL,
+        zone_id TEXT NOT NULL,
+        step_id TEXT NOT NULL,
+        completed INTEGER DEFAULT 0,
+        completed_at INTEGER,
+        PRIMARY KEY (user_id, zone_id, step_id)
+    ) WITHOUT ROWID
+'''
+
+def init_campaign_database(db: 'DatabaseManager'):
+    """Initialize the campaign progress table on the shared connection"""
+    if db.db_path in _INITIALIZED:
+        return
+
+    with db.lock:
+        cursor = db.conn.cursor()
+
+        # Older databases used a synthetic AUTOINCREMENT id plus a UNIQUE
+        # constraint — two B-trees keyed on the same 3-tuple. Migrate them
+        # to the WITHOUT ROWID shape below, which stores one.
+        columns = [row[1] for row in cursor.execute(
+            'PRAGMA table_info(campaign_progress)')]
+        if 'id' in columns:
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute(
+                    'ALTER TABLE campaign_progress RENAME TO campaign_progress_old')
+                cursor.execute(_DDL_CAMPAIGN_PROGRESS)
+                cursor.execute('''
+                    INSERT INTO campaign_progress
+                    (user_id, zone_id, step_id, completed, completed_at)
+                    SELECT user_id, zone_id, step_id, completed, completed_at
+                    FROM campaign_progress_old
+                ''')
+                cursor.execute('DROP TABLE campaign_progress_old')
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+        else:
+            cursor.execute(_DDL_CAMPAIGN_PROGRESS)
+
+        cursor.execute('ANALYZE')
 
-def get_user_progress(db_path: str, username: str) -> Dict[str, List[str]]:
+    _INITIALIZED.add(db.db_path)
+
+# The full zone/step grid as a VALUES CTE, built from ZONES at import.
+# LEFT JOINing campaign_progress onto it answers "which defined steps has
+# this user completed" in one query, in definition order, with no
+# Python-side reconciliation of defined vs stored steps.
+_STEP_GRID_VALUES = ', '.join(
+    f"('{zone_id}', '{step_id}', {idx})"
+    for zone_id, step_ids in ZONE_STEP_IDS.items()
+    for idx, step_id in enumerate(step_ids, 1)
+)
+
+_Q_STEP_GRID = f'''
+    WITH steps(zone_id, step_id, idx) AS (VALUES {_STEP_GRID_VALUES})
+    SELECT s.zone_id, s.step_id, s.idx, cp.completed IS 1
+    FROM steps s
+    LEFT JOIN campaign_progress cp
+        ON cp.user_id = ? AND cp.zone_id = s.zone_id AND cp.step_id = s.step_id
+    ORDER BY s.zone_id, s.idx
+'''
+
+def get_campaign_step_grid(db: 'DatabaseManager', username: str) -> List[Tuple[str, str, int, int]]:
+    """All defined (zone_id, step_id, idx, completed) rows for a user."""
+    with db.lock:
+        return db.conn.execute(_Q_STEP_GRID, (username,)).fetchall()
+
+def get_user_progress(db: 'DatabaseManager', username: str) -> Dict[str, Set[str]]:
     """Get user's campaign progress from database"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT zone_id, step_id FROM campaign_progress 
-        WHERE user_id = ? AND completed = 1
-    ''', (username,))
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
-    progress = {}
-    for zone_id, step_id in rows:
-        if zone_id not in progress:
-            progress[zone_id] = []
-        progress[zone_id].append(step_id)
-    
+    progress: Dict[str, Set[str]] = {}
+    for zone_id, step_id, _, completed in get_campaign_step_grid(db, username):
+        if completed:
+            progress.setdefault(zone_id, set()).add(step_id)
     return progress
 
-def mark_step_completed(db_path: str, username: str, zone_id: str, step_id: str):
+_Q_UPSERT_STEP = '''
+    INSERT INTO campaign_progress
+    (user_id, zone_id, step_id, completed, completed_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, zone_id, step_id) DO UPDATE SET
+        completed = excluded.completed,
+        completed_at = excluded.completed_at
+'''
+
+def mark_step_completed(db: 'DatabaseManager', username: str, zone_id: str, step_id: str):
     """Mark a quest step as completed"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT OR REPLACE INTO campaign_progress 
-        (user_id, zone_id, step_id, completed, completed_at)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (username, zone_id, step_id, True, datetime.now().isoformat()))
-    
-    conn.commit()
-    conn.close()
+    with db.lock:
+        db.conn.execute(_Q_UPSERT_STEP,
+                        (username, zone_id, step_id, True, int(time.time())))
 
-def is_step_completed(progress: Dict[str, List[str]], zone_id: str, step_id: str) -> bool:
+def try_mark_step_completed(db: 'DatabaseManager', username: str, zone_id: str, step_id: str) -> bool:
+    """Mark a step completed; returns False if it was already completed.
+
+    The idempotency check lives in the SQL (DO NOTHING RETURNING), so one
+    round-trip both writes and answers whether anything changed.
+    """
+    with db.lock:
+        row = db.conn.execute('''
+            INSERT INTO campaign_progress
+            (user_id, zone_id, step_id, completed, completed_at)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT(user_id, zone_id, step_id) DO NOTHING
+            RETURNING 1
+        ''', (username, zone_id, step_id, int(time.time()))).fetchone()
+    return row is not None
+
+def mark_steps_completed(db: 'DatabaseManager', username: str, items: List[Tuple[str, str]]):
+    """Mark many (zone_id, step_id) steps completed in one transaction."""
+    if not items:
+        return
+    now = int(time.time())
+    rows = [(username, zone_id, step_id, True, now) for zone_id, step_id in items]
+    with db.lock:
+        db.conn.execute('BEGIN IMMEDIATE')
+        try:
+            db.conn.executemany(_Q_UPSERT_STEP, rows)
+            db.conn.execute('COMMIT')
+        except Exception:
+            db.conn.execute('ROLLBACK')
+            raise
+
+def is_step_completed(progress: Dict[str, Set[str]], zone_id: str, step_id: str) -> bool:
     """Check if a specific step is completed"""
     return zone_id in progress and step_id in progress[zone_id]
 
-def is_zone_unlocked(progress: Dict[str, List[str]], zone_id: str) -> bool:
+def is_zone_unlocked(progress: Dict[str, Set[str]], zone_id: str) -> bool:
     """Check if a zone is unlocked (first zone always unlocked)"""
     if zone_id == "green_valley":
         return True
-    
-    # Define unlock requirements
-    unlock_requirements = {
-        "azure_city": ("green_valley", 1),  # Need 1 completed step in Green Valley
-        "scarlet_tower": ("azure_city", 1)   # Need 1 completed step in Azure City
-    }
-    
-    if zone_id not in unlock_requirements:
+
+    if zone_id not in _UNLOCK_REQUIREMENTS:
         return False
-        
-    required_zone, required_steps = unlock_requirements[zone_id]
+
+    required_zone, required_steps = _UNLOCK_REQUIREMENTS[zone_id]
     return (required_zone in progress and 
             len(progress[required_zone]) >= required_steps)
 
-def show_campaign_map(console: Console, progress: Dict[str, List[str]]):
+# Fully rendered map screens keyed by progress snapshot; menu ticks that
+# don't change progress replay the cached ANSI string instead of re-running
+# the Rich layout
+_map_cache: Dict[tuple, str] = {}
+
+def _progress_key(progress: Dict[str, Set[str]]) -> tuple:
+    return tuple(sorted((zone_id, tuple(sorted(steps)))
+                        for zone_id, steps in progress.items()))
+
+def show_campaign_map(console: Console, progress: Dict[str, Set[str]]):
     """Display the campaign map with zone statuses"""
     console.clear()
-    
+
+    key = _progress_key(progress)
+    cached = _map_cache.get(key)
+    if cached is not None:
+        console.file.write(cached)
+        return
+
+    with console.capture() as capture:
+        _render_campaign_map(console, progress)
+    _map_cache[key] = capture.get()
+    console.file.write(_map_cache[key])
+
+def _render_campaign_map(console: Console, progress: Dict[str, Set[str]]):
     title = Text("🗺️ QUEST CAMPAIGN MAP 🗺️", style="bold magenta")
     console.print(Panel(title, border_style="bright_magenta"))
-    
+
     for zone_id, zone_data in ZONES.items():
         # Determine zone status
         if is_zone_unlocked(progress, zone_id):
@@ -196,51 +332,57 @@ def show_campaign_map(console: Console, progress: Dict[str, List[str]]):
             status_style = "bold red"
         
         # Count completed steps
-        completed_steps = len(progress.get(zone_id, []))
-        total_steps = len(zone_data["steps"])
+        completed_steps = len(progress.get(zone_id, ()))
+        total_steps = ZONE_STEP_COUNT[zone_id]
         
         # Create zone panel
+        styles = ZONE_STYLES[zone_id]
         zone_text = Text()
-        zone_text.append(f"{zone_data['emoji']} {zone_data['name']}\n", style=f"bold {zone_data['color']}")
-        zone_text.append(f"{zone_data['description']}\n\n", style="white")
+        zone_text.append(f"{styles['header']}\n", style=styles['title'])
+        zone_text.append(f"{zone_data.description}\n\n", style="white")
         zone_text.append(f"Progress: {completed_steps}/{total_steps} steps completed\n", style="cyan")
         zone_text.append(status, style=status_style)
-        
-        console.print(Panel(zone_text, border_style=zone_data['color']))
+
+        console.print(Panel(zone_text, border_style=styles['border']))
     
     console.print(Panel("🧭 [bold cyan]Navigate through zones to complete quests![/bold cyan]", 
                        border_style="blue"))
 
-def show_zone_details(console: Console, zone_id: str, progress: Dict[str, List[str]]):
+def show_zone_details(console: Console, zone_id: str, progress: Dict[str, Set[str]]):
     """Show details for a specific zone"""
     if zone_id not in ZONES:
         console.print("[red]Invalid zone selected.[/red]")
         return
     
     zone_data = ZONES[zone_id]
+    styles = ZONE_STYLES[zone_id]
     console.clear()
-    
+
     # Zone header
-    title = Text(f"{zone_data['emoji']} {zone_data['name']} {zone_data['emoji']}", 
-                 style=f"bold {zone_data['color']}")
-    console.print(Panel(title, border_style=zone_data['color']))
-    
+    title = Text(f"{styles['header']} {zone_data.emoji}", style=styles['title'])
+    console.print(Panel(title, border_style=styles['border']))
+
     # Zone description
-    console.print(Panel(zone_data['description'], border_style=zone_data['color']))
-    
+    console.print(Panel(zone_data.description, border_style=styles['border']))
+
     # Steps table
-    table = Table(title="📜 Quest Steps", border_style=zone_data['color'])
+    table = Table(title="📜 Quest Steps", border_style=styles['border'])
     table.add_column("Step", style="cyan", justify="right")
     table.add_column("Title", style="white")
     table.add_column("Status", style="white")
     table.add_column("Description", style="dim")
     
-    for i, step in enumerate(zone_data['steps'], 1):
+    # One pass over the zone's steps; the loop below reads the bitmap
+    # instead of calling is_step_completed twice per row
+    done_set = progress.get(zone_id, set())
+    done = [step_id in done_set for step_id in ZONE_STEP_IDS[zone_id]]
+
+    for i, step in enumerate(zone_data.steps, 1):
         # Determine step status
-        if is_step_completed(progress, zone_id, step['id']):
+        if done[i-1]:
             status = "✅ Completed"
             status_style = "bold green"
-        elif i == 1 or is_step_completed(progress, zone_id, zone_data['steps'][i-2]['id']):
+        elif i == 1 or done[i-2]:
             status = "🔄 In Progress"
             status_style = "bold yellow"
         else:
@@ -249,56 +391,58 @@ def show_zone_details(console: Console, zone_id: str, progress: Dict[str, List[s
         
         table.add_row(
             str(i),
-            step['title'],
+            step.title,
             status,
-            step['description']
+            step.description
         )
     
     console.print(table)
     
     # Zone progress
-    completed_steps = len(progress.get(zone_id, []))
-    total_steps = len(zone_data['steps'])
+    completed_steps = len(progress.get(zone_id, ()))
+    total_steps = ZONE_STEP_COUNT[zone_id]
     progress_text = Text(f"\nProgress: {completed_steps}/{total_steps} steps completed", style="bold cyan")
     console.print(progress_text)
 
-def show_step_details(console: Console, zone_id: str, step_index: int, progress: Dict[str, List[str]]):
+def show_step_details(console: Console, zone_id: str, step_index: int, progress: Dict[str, Set[str]]):
     """Show details for a specific step"""
     if zone_id not in ZONES:
         console.print("[red]Invalid zone selected.[/red]")
         return
     
     zone_data = ZONES[zone_id]
-    if step_index < 0 or step_index >= len(zone_data['steps']):
+    if step_index < 0 or step_index >= ZONE_STEP_COUNT[zone_id]:
         console.print("[red]Invalid step selected.[/red]")
         return
-    
-    step = zone_data['steps'][step_index]
-    
+
+    step = zone_data.steps[step_index]
+    prev_step = PREV_STEP_ID[zone_id][step_index]
+
     # Check if step is unlocked
-    if step_index > 0 and not is_step_completed(progress, zone_id, zone_data['steps'][step_index-1]['id']):
+    if prev_step is not None and not is_step_completed(progress, zone_id, prev_step):
         console.print("[red]🔒 This step is locked. Complete the previous step first.[/red]")
         return
-    
+
     console.clear()
-    
+    styles = ZONE_STYLES[zone_id]
+
     # Step header
-    title = Text(f"Step {step_index + 1}: {step['title']}", style=f"bold {zone_data['color']}")
-    console.print(Panel(title, border_style=zone_data['color']))
-    
+    title = Text(f"Step {step_index + 1}: {step.title}", style=styles['title'])
+    console.print(Panel(title, border_style=styles['border']))
+
     # Narrative
-    narrative = Text(step['narrative'], style="italic white")
-    console.print(Panel(narrative, title="📖 Quest Narrative", border_style=zone_data['color']))
-    
+    narrative = Text(step.narrative, style="italic white")
+    console.print(Panel(narrative, title="📖 Quest Narrative", border_style=styles['border']))
+
     # Objective
-    objective = Text(step['description'], style="bold white")
+    objective = Text(step.description, style="bold white")
     console.print(Panel(objective, title="🎯 Objective", border_style="blue"))
     
     # Challenge information
-    if step['challenge_id']:
+    if step.challenge_id:
         challenge_info = Text(f"To complete this quest step, go to the main menu and select:\n", style="white")
         challenge_info.append(f"Start Challenge → Find challenge with ID: ", style="cyan")
-        challenge_info.append(f"{step['challenge_id']}\n\n", style="bold yellow")
+        challenge_info.append(f"{step.challenge_id}\n\n", style="bold yellow")
         challenge_info.append("After completing the challenge, return here and mark this step as completed.", style="white")
         console.print(Panel(challenge_info, title="⚡ How to Proceed", border_style="green"))
     else:
@@ -306,51 +450,49 @@ def show_step_details(console: Console, zone_id: str, step_index: int, progress:
                            title="🚧 Coming Soon", border_style="yellow"))
     
     # Status
-    if is_step_completed(progress, zone_id, step['id']):
+    if is_step_completed(progress, zone_id, step.id):
         status = Text("✅ This step is already completed!", style="bold green")
-    elif step_index == 0 or is_step_completed(progress, zone_id, zone_data['steps'][step_index-1]['id']):
+    elif prev_step is None or is_step_completed(progress, zone_id, prev_step):
         status = Text("🔄 This step is ready to be completed", style="bold yellow")
     else:
         status = Text("🔒 This step is locked", style="bold red")
     
-    console.print(Panel(status, border_style=zone_data['color']))
+    console.print(Panel(status, border_style=styles['border']))
 
-def mark_step_as_completed_ui(console: Console, db_path: str, username: str, zone_id: str, step_index: int, progress: Dict[str, List[str]]):
+def mark_step_as_completed_ui(console: Console, db: 'DatabaseManager', username: str, zone_id: str, step_index: int, progress: Dict[str, Set[str]]):
     """UI flow to mark a step as completed"""
     if zone_id not in ZONES:
         console.print("[red]Invalid zone selected.[/red]")
         return progress
     
     zone_data = ZONES[zone_id]
-    if step_index < 0 or step_index >= len(zone_data['steps']):
+    if step_index < 0 or step_index >= ZONE_STEP_COUNT[zone_id]:
         console.print("[red]Invalid step selected.[/red]")
         return progress
-    
-    step = zone_data['steps'][step_index]
-    
-    # Check if step is already completed
-    if is_step_completed(progress, zone_id, step['id']):
-        console.print("[yellow]This step is already marked as completed.[/yellow]")
-        return progress
-    
+
+    step = zone_data.steps[step_index]
+
     # Check if step is unlocked
-    if step_index > 0 and not is_step_completed(progress, zone_id, zone_data['steps'][step_index-1]['id']):
+    prev_step = PREV_STEP_ID[zone_id][step_index]
+    if prev_step is not None and not is_step_completed(progress, zone_id, prev_step):
         console.print("[red]🔒 This step is locked. Complete the previous step first.[/red]")
         return progress
     
     # Confirm completion
-    console.print(f"[bold yellow]Mark '{step['title']}' as completed?[/bold yellow]")
+    console.print(f"[bold yellow]Mark '{step.title}' as completed?[/bold yellow]")
     choice = Prompt.ask("Enter 'y' to confirm or any other key to cancel", default="n")
     
     if choice.lower() == 'y':
-        mark_step_completed(db_path, username, zone_id, step['id'])
-        console.print("[green]✅ Step marked as completed![/green]")
-        
+        # The insert itself reports whether the step was new; no separate
+        # already-completed pre-check needed
+        if try_mark_step_completed(db, username, zone_id, step.id):
+            console.print("[green]✅ Step marked as completed![/green]")
+        else:
+            console.print("[yellow]This step is already marked as completed.[/yellow]")
+
         # Update progress in memory
-        if zone_id not in progress:
-            progress[zone_id] = []
-        progress[zone_id].append(step['id'])
-        
+        progress.setdefault(zone_id, set()).add(step.id)
+
         # Pause to let user see the confirmation
         input("\nPress Enter to continue...")
     
@@ -360,14 +502,18 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
     """Interactive quest/campaign mode for PyMaster."""
     
     # Initialize campaign database
-    init_campaign_database(db.db_path)
-    
+    init_campaign_database(db)
+
     # Get user progress
-    progress = get_user_progress(db.db_path, username)
+    progress = get_user_progress(db, username)
     
     while True:
+        # One unlock pass per menu tick; every branch below tests membership
+        # instead of re-running is_zone_unlocked
+        unlocked = {zone_id for zone_id in ZONE_IDS if is_zone_unlocked(progress, zone_id)}
+
         show_campaign_map(console, progress)
-        
+
         # Menu options
         console.print("\n[bold cyan]=== Quest Campaign Menu ===[/bold cyan]")
         console.print("1. View Zone Details")
@@ -380,22 +526,19 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
         
         if choice == "1":
             # View zone details
-            zone_choices = list(ZONES.keys())
+            zone_choices = list(ZONE_IDS)
             console.print("\n[bold]Available Zones:[/bold]")
             for i, zone_id in enumerate(zone_choices, 1):
-                zone_name = ZONES[zone_id]['name']
-                if is_zone_unlocked(progress, zone_id):
-                    status = "✅"
-                else:
-                    status = "🔒"
+                zone_name = ZONES[zone_id].name
+                status = "✅" if zone_id in unlocked else "🔒"
                 console.print(f"{i}. {status} {zone_name}")
             
             try:
-                zone_idx = int(Prompt.ask("Select a zone", 
-                                        choices=[str(i) for i in range(1, len(zone_choices)+1)])) - 1
+                zone_idx = int(Prompt.ask("Select a zone",
+                                        choices=_CHOICES[len(zone_choices)])) - 1
                 selected_zone = zone_choices[zone_idx]
                 
-                if not is_zone_unlocked(progress, selected_zone):
+                if selected_zone not in unlocked:
                     console.print("[red]🔒 This zone is locked. Complete previous zones to unlock it.[/red]")
                     input("\nPress Enter to continue...")
                     continue
@@ -408,7 +551,7 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
         
         elif choice == "2":
             # View step details
-            zone_choices = [zone_id for zone_id in ZONES.keys() if is_zone_unlocked(progress, zone_id)]
+            zone_choices = [zone_id for zone_id in ZONE_IDS if zone_id in unlocked]
             if not zone_choices:
                 console.print("[red]No zones are currently unlocked.[/red]")
                 input("\nPress Enter to continue...")
@@ -416,21 +559,21 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
             
             console.print("\n[bold]Available Zones:[/bold]")
             for i, zone_id in enumerate(zone_choices, 1):
-                zone_name = ZONES[zone_id]['name']
+                zone_name = ZONES[zone_id].name
                 console.print(f"{i}. {zone_name}")
             
             try:
-                zone_idx = int(Prompt.ask("Select a zone", 
-                                        choices=[str(i) for i in range(1, len(zone_choices)+1)])) - 1
+                zone_idx = int(Prompt.ask("Select a zone",
+                                        choices=_CHOICES[len(zone_choices)])) - 1
                 selected_zone = zone_choices[zone_idx]
                 
                 zone_data = ZONES[selected_zone]
-                console.print(f"\n[bold]Steps in {zone_data['name']}:[/bold]")
-                for i, step in enumerate(zone_data['steps'], 1):
-                    console.print(f"{i}. {step['title']}")
+                console.print(f"\n[bold]Steps in {zone_data.name}:[/bold]")
+                for i, step in enumerate(zone_data.steps, 1):
+                    console.print(f"{i}. {step.title}")
                 
-                step_idx = int(Prompt.ask("Select a step", 
-                                        choices=[str(i) for i in range(1, len(zone_data['steps'])+1)])) - 1
+                step_idx = int(Prompt.ask("Select a step",
+                                        choices=_CHOICES[ZONE_STEP_COUNT[selected_zone]])) - 1
                 
                 show_step_details(console, selected_zone, step_idx, progress)
                 input("\nPress Enter to continue...")
@@ -440,7 +583,7 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
         
         elif choice == "3":
             # Mark step as completed
-            zone_choices = [zone_id for zone_id in ZONES.keys() if is_zone_unlocked(progress, zone_id)]
+            zone_choices = [zone_id for zone_id in ZONE_IDS if zone_id in unlocked]
             if not zone_choices:
                 console.print("[red]No zones are currently unlocked.[/red]")
                 input("\nPress Enter to continue...")
@@ -448,29 +591,31 @@ def run_quest_campaign(console: Console, db: 'DatabaseManager', validator: 'Chal
             
             console.print("\n[bold]Available Zones:[/bold]")
             for i, zone_id in enumerate(zone_choices, 1):
-                zone_name = ZONES[zone_id]['name']
+                zone_name = ZONES[zone_id].name
                 console.print(f"{i}. {zone_name}")
             
             try:
-                zone_idx = int(Prompt.ask("Select a zone", 
-                                        choices=[str(i) for i in range(1, len(zone_choices)+1)])) - 1
+                zone_idx = int(Prompt.ask("Select a zone",
+                                        choices=_CHOICES[len(zone_choices)])) - 1
                 selected_zone = zone_choices[zone_idx]
                 
                 zone_data = ZONES[selected_zone]
-                console.print(f"\n[bold]Steps in {zone_data['name']}:[/bold]")
-                for i, step in enumerate(zone_data['steps'], 1):
-                    if is_step_completed(progress, selected_zone, step['id']):
+                console.print(f"\n[bold]Steps in {zone_data.name}:[/bold]")
+                done_set = progress.get(selected_zone, set())
+                done = [step_id in done_set for step_id in ZONE_STEP_IDS[selected_zone]]
+                for i, step in enumerate(zone_data.steps, 1):
+                    if done[i-1]:
                         status = "✅"
-                    elif i == 1 or is_step_completed(progress, selected_zone, zone_data['steps'][i-2]['id']):
+                    elif i == 1 or done[i-2]:
                         status = "🔄"
                     else:
                         status = "🔒"
-                    console.print(f"{i}. {status} {step['title']}")
+                    console.print(f"{i}. {status} {step.title}")
                 
-                step_idx = int(Prompt.ask("Select a step to mark as completed", 
-                                        choices=[str(i) for i in range(1, len(zone_data['steps'])+1)])) - 1
+                step_idx = int(Prompt.ask("Select a step to mark as completed",
+                                        choices=_CHOICES[ZONE_STEP_COUNT[selected_zone]])) - 1
                 
-                progress = mark_step_as_completed_ui(console, db.db_path, username, selected_zone, step_idx, progress)
+                progress = mark_step_as_completed_ui(console, db, username, selected_zone, step_idx, progress)
             except (ValueError, IndexError):
                 console.print("[red]Invalid selection.[/red]")
                 input("\nPress Enter to continue...")